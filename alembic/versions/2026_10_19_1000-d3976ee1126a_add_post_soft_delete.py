@@ -0,0 +1,44 @@
+"""Add soft delete to Post table.
+
+Revision ID: d3976ee1126a
+Revises: 3d4b3aa9a212
+Create Date: 2026-10-19 10:00:12.481516
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3976ee1126a'
+down_revision = '3d4b3aa9a212'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'post',
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        schema='webtronics'
+    )
+    op.create_index(
+        'ix_post_creation_dt_alive',
+        'post',
+        ['creation_dt'],
+        schema='webtronics',
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+    op.create_index(
+        'ix_post_deleted_at',
+        'post',
+        ['deleted_at'],
+        schema='webtronics',
+        postgresql_where=sa.text('deleted_at IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_post_deleted_at', table_name='post', schema='webtronics')
+    op.drop_index('ix_post_creation_dt_alive', table_name='post', schema='webtronics')
+    op.drop_column('post', 'deleted_at', schema='webtronics')
@@ -0,0 +1,42 @@
+"""Add author_stats summary table.
+
+Revision ID: 5b1e0c7a9f42
+Revises: d3976ee1126a
+Create Date: 2026-10-19 11:00:41.902315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b1e0c7a9f42'
+down_revision = 'd3976ee1126a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('author_stats',
+    sa.Column('author_id', sa.UUID(), nullable=False),
+    sa.Column('post_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('likes_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('dislikes_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('last_post_dt', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['author_id'], ['webtronics.user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('author_id'),
+    schema='webtronics'
+    )
+    op.execute("""
+        INSERT INTO webtronics.author_stats
+            (author_id, post_count, likes_count, dislikes_count, last_post_dt)
+        SELECT author_id, count(*), coalesce(sum(likes_count), 0),
+               coalesce(sum(dislikes_count), 0), max(creation_dt)
+        FROM webtronics.post
+        WHERE deleted_at IS NULL
+        GROUP BY author_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('author_stats', schema='webtronics')
@@ -0,0 +1,126 @@
+"""Partition Post table by month of creation_dt.
+
+Revision ID: 8c2f4e61d0b7
+Revises: 5b1e0c7a9f42
+Create Date: 2026-10-19 12:00:07.318204
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c2f4e61d0b7'
+down_revision = '5b1e0c7a9f42'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+COLUMNS = (
+    'id, title, content, author_id, creation_dt, '
+    'likes_count, dislikes_count, deleted_at'
+)
+
+
+def add_months(month_start: datetime, months: int) -> datetime:
+    year, month = divmod(month_start.month - 1 + months, 12)
+    return month_start.replace(year=month_start.year + year, month=month + 1)
+
+
+def create_indexes() -> None:
+    op.create_index(
+        'ix_post_creation_dt_alive',
+        'post',
+        ['creation_dt'],
+        schema='webtronics',
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+    op.create_index(
+        'ix_post_deleted_at',
+        'post',
+        ['deleted_at'],
+        schema='webtronics',
+        postgresql_where=sa.text('deleted_at IS NOT NULL')
+    )
+
+
+def upgrade() -> None:
+    # Таблица копируется целиком под блокировкой: на большой базе
+    # миграцию нужно запускать в окно обслуживания.
+    op.execute('LOCK TABLE webtronics.post IN ACCESS EXCLUSIVE MODE')
+    op.execute("""
+        CREATE TABLE webtronics.post_partitioned (
+            id UUID NOT NULL,
+            title VARCHAR(120) NOT NULL,
+            content TEXT,
+            author_id UUID NOT NULL,
+            creation_dt TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            likes_count INTEGER,
+            dislikes_count INTEGER,
+            deleted_at TIMESTAMP WITHOUT TIME ZONE,
+            CONSTRAINT post_partitioned_pkey PRIMARY KEY (id, creation_dt)
+        ) PARTITION BY RANGE (creation_dt)
+    """)
+    oldest = op.get_bind().execute(
+        sa.text('SELECT min(creation_dt) FROM webtronics.post')
+    ).scalar() or datetime.now()
+    month_start = oldest.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    last_month = add_months(
+        datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0),
+        MONTHS_AHEAD
+    )
+    while month_start <= last_month:
+        next_month = add_months(month_start, 1)
+        op.execute(
+            f'CREATE TABLE webtronics.post_y{month_start:%Y}m{month_start:%m} '
+            f'PARTITION OF webtronics.post_partitioned '
+            f"FOR VALUES FROM ('{month_start:%Y-%m-%d}') TO ('{next_month:%Y-%m-%d}')"
+        )
+        month_start = next_month
+    op.execute(
+        f'INSERT INTO webtronics.post_partitioned ({COLUMNS}) '
+        f'SELECT {COLUMNS} FROM webtronics.post'
+    )
+    op.drop_table('post', schema='webtronics')
+    op.rename_table('post_partitioned', 'post', schema='webtronics')
+    op.execute(
+        'ALTER TABLE webtronics.post RENAME CONSTRAINT post_partitioned_pkey TO post_pkey'
+    )
+    op.create_foreign_key(
+        'post_author_id_fkey', 'post', 'user', ['author_id'], ['id'],
+        source_schema='webtronics', referent_schema='webtronics'
+    )
+    create_indexes()
+
+
+def downgrade() -> None:
+    op.execute('LOCK TABLE webtronics.post IN ACCESS EXCLUSIVE MODE')
+    op.create_table('post_heap',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('title', sa.String(length=120), nullable=False),
+    sa.Column('content', sa.Text(), nullable=True),
+    sa.Column('author_id', sa.UUID(), nullable=False),
+    sa.Column('creation_dt', sa.DateTime(), nullable=False),
+    sa.Column('likes_count', sa.Integer(), nullable=True),
+    sa.Column('dislikes_count', sa.Integer(), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id', name='post_heap_pkey'),
+    sa.UniqueConstraint('id', name='post_heap_id_key'),
+    schema='webtronics'
+    )
+    op.execute(
+        f'INSERT INTO webtronics.post_heap ({COLUMNS}) '
+        f'SELECT {COLUMNS} FROM webtronics.post'
+    )
+    op.drop_table('post', schema='webtronics')
+    op.rename_table('post_heap', 'post', schema='webtronics')
+    op.execute('ALTER TABLE webtronics.post RENAME CONSTRAINT post_heap_pkey TO post_pkey')
+    op.execute('ALTER TABLE webtronics.post RENAME CONSTRAINT post_heap_id_key TO post_id_key')
+    op.create_foreign_key(
+        'post_author_id_fkey', 'post', 'user', ['author_id'], ['id'],
+        source_schema='webtronics', referent_schema='webtronics'
+    )
+    create_indexes()
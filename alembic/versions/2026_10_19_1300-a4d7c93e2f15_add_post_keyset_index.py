@@ -0,0 +1,40 @@
+"""Index Post by (creation_dt, id) for keyset pagination.
+
+Revision ID: a4d7c93e2f15
+Revises: 8c2f4e61d0b7
+Create Date: 2026-10-19 13:00:04.552190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d7c93e2f15'
+down_revision = '8c2f4e61d0b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # На секционированной таблице индекс строится без CONCURRENTLY
+    # и блокирует запись в post на время построения.
+    op.drop_index('ix_post_creation_dt_alive', table_name='post', schema='webtronics')
+    op.create_index(
+        'ix_post_creation_dt_id_alive',
+        'post',
+        ['creation_dt', 'id'],
+        schema='webtronics',
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_post_creation_dt_id_alive', table_name='post', schema='webtronics')
+    op.create_index(
+        'ix_post_creation_dt_alive',
+        'post',
+        ['creation_dt'],
+        schema='webtronics',
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
@@ -0,0 +1,32 @@
+"""Index Post by (author_id, creation_dt) for the author's last post date.
+
+Revision ID: e7b15a0c3d68
+Revises: a4d7c93e2f15
+Create Date: 2026-10-19 14:00:12.318407
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b15a0c3d68'
+down_revision = 'a4d7c93e2f15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # На секционированной таблице индекс строится без CONCURRENTLY
+    # и блокирует запись в post на время построения.
+    op.create_index(
+        'ix_post_author_id_creation_dt_alive',
+        'post',
+        ['author_id', 'creation_dt'],
+        schema='webtronics',
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_post_author_id_creation_dt_alive', table_name='post', schema='webtronics')
@@ -0,0 +1,91 @@
+"""
+Пропускная способность подписи и проверки access-токенов
+для разных алгоритмов и библиотек (python-jose и PyJWT).
+
+    python -m benchmarks.bench_jwt [--number 2000]
+"""
+import argparse
+import timeit
+from datetime import datetime, timedelta
+
+import jwt as pyjwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+try:
+    from jose import jwt as jose_jwt
+except ImportError:
+    jose_jwt = None
+
+
+SECRET = 'benchmark-secret-key-with-enough-length-for-hs256'
+
+
+def get_claims() -> dict:
+    return {
+        'sub': 'd0f3c7a4-0d4c-4f8e-9a35-1b7b5c1f8a11',
+        'sid': 'benchmark',
+        'exp': datetime.utcnow() + timedelta(days=1)
+    }
+
+
+def get_cases() -> list[tuple[str, callable, callable]]:
+    es256_key = ec.generate_private_key(ec.SECP256R1())
+    eddsa_key = ed25519.Ed25519PrivateKey.generate()
+    es256_pem = es256_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode()
+    es256_public_pem = es256_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    claims = get_claims()
+    cases = [
+        (
+            'PyJWT HS256',
+            lambda: pyjwt.encode(claims, SECRET, algorithm='HS256'),
+            lambda token: pyjwt.decode(token, SECRET, algorithms=['HS256'])
+        ),
+        (
+            'PyJWT ES256',
+            lambda: pyjwt.encode(claims, es256_key, algorithm='ES256'),
+            lambda token: pyjwt.decode(token, es256_key.public_key(), algorithms=['ES256'])
+        ),
+        (
+            'PyJWT EdDSA',
+            lambda: pyjwt.encode(claims, eddsa_key, algorithm='EdDSA'),
+            lambda token: pyjwt.decode(token, eddsa_key.public_key(), algorithms=['EdDSA'])
+        ),
+    ]
+    if jose_jwt is not None:
+        cases += [
+            (
+                'python-jose HS256',
+                lambda: jose_jwt.encode(claims, SECRET, algorithm='HS256'),
+                lambda token: jose_jwt.decode(token, SECRET, algorithms=['HS256'])
+            ),
+            (
+                'python-jose ES256',
+                lambda: jose_jwt.encode(claims, es256_pem, algorithm='ES256'),
+                lambda token: jose_jwt.decode(token, es256_public_pem, algorithms=['ES256'])
+            ),
+        ]
+    return cases
+
+
+def main(number: int) -> None:
+    print(f'{"backend / algorithm":<22}{"sign, ops/s":>14}{"verify, ops/s":>16}')
+    for name, sign, verify in get_cases():
+        token = sign()
+        sign_time = min(timeit.repeat(sign, number=number, repeat=3))
+        verify_time = min(timeit.repeat(lambda: verify(token), number=number, repeat=3))
+        print(f'{name:<22}{number / sign_time:>14,.0f}{number / verify_time:>16,.0f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=2000)
+    args = parser.parse_args()
+    main(args.number)
@@ -0,0 +1,84 @@
+"""
+Пропускная способность лайков: проверка автора поста запросом к Postgres
+(прежняя реализация check_user_allowed_like_or_dislike) против кэша
+'post_id -> author_id' в Redis и в процессе.
+
+Нужны запущенные Postgres и Redis из настроек. Тестовые пользователь и пост
+создаются в транзакции, которая откатывается, ключи Redis удаляются в конце.
+
+    python -m benchmarks.bench_like [--likes 5000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from databases import DATABASE_DSN, get_redis
+from src.models import Post, User
+from src.services.cache_service import PostAuthorCacheService
+from src.services.post_service import PostService
+from src.services.reaction_service import LIKE, ReactionService
+
+
+async def check_author_in_postgres(post_id: str, user_id: str, db_session: AsyncSession, cache) -> None:
+    query = select(Post).filter(Post.id == post_id, Post.author_id == user_id)
+    result = await db_session.execute(query)
+    result.one_or_none()
+
+
+async def check_author_in_cache(post_id: str, user_id: str, db_session: AsyncSession, cache) -> None:
+    await PostService.get_post_author_id(post_id, db_session, cache)
+
+
+async def run_likes(check_author, post_id: str, db_session: AsyncSession, cache, likes: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    lock = asyncio.Lock()
+
+    async def like() -> None:
+        user_id = str(uuid.uuid4())
+        async with semaphore:
+            # Одно соединение с Postgres не допускает параллельных запросов.
+            async with lock:
+                await check_author(post_id, user_id, db_session, cache)
+            await ReactionService.add_reaction(post_id, user_id, LIKE, cache)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(like() for _ in range(likes)))
+    return likes / (time.perf_counter() - started)
+
+
+async def main(likes: int, concurrency: int) -> None:
+    cache = await get_redis()
+    engine = create_async_engine(DATABASE_DSN)
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        db_session = AsyncSession(bind=connection)
+        author_id, post_id = uuid.uuid4(), uuid.uuid4()
+        await db_session.execute(insert(User.__table__).values(
+            id=author_id, login=f'bench-{author_id}', hashed_password='-',
+            email=f'{author_id}@bench.local'
+        ))
+        await db_session.execute(insert(Post.__table__).values(
+            id=post_id, title='Benchmark post', content='', author_id=author_id
+        ))
+        for name, check_author in (('postgres', check_author_in_postgres), ('cache', check_author_in_cache)):
+            likes_per_second = await run_likes(
+                check_author, str(post_id), db_session, cache, likes, concurrency
+            )
+            print(f'{name:<10}{likes_per_second:>12,.0f} likes/s')
+        await transaction.rollback()
+        await ReactionService.purge_posts([str(post_id)], cache)
+        await PostAuthorCacheService.delete_author_ids([str(post_id)], cache)
+    await engine.dispose()
+    await cache.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--likes', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.likes, args.concurrency))
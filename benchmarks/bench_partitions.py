@@ -0,0 +1,171 @@
+"""
+Время запросов к списку постов: обычная таблица против помесячно
+секционированной по creation_dt. Обе таблицы повторяют структуру
+webtronics.post и заполняются одинаковыми синтетическими данными
+(generate_series на стороне сервера) в отдельной схеме bench_partitions,
+которая удаляется после замеров.
+
+Для каждого запроса печатается лучшее время и число реально прочитанных
+таблиц и секций по EXPLAIN ANALYZE. Поиск поста по одному id читает все
+секции, поэтому он сравнивается с поиском по id и creation_dt, который
+сервис выполняет для id с закодированным creation_dt (UUIDv7).
+
+    python -m benchmarks.bench_partitions [--rows 10000000] [--months 36] [--keep]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from databases import DATABASE_DSN
+from src.services.partition_service import PostPartitionService
+
+
+SCHEMA = 'bench_partitions'
+
+COLUMNS = """
+    id UUID NOT NULL,
+    title VARCHAR(120) NOT NULL,
+    content TEXT,
+    author_id UUID NOT NULL,
+    creation_dt TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    likes_count INTEGER,
+    dislikes_count INTEGER,
+    deleted_at TIMESTAMP WITHOUT TIME ZONE
+"""
+
+QUERIES = (
+    ('first page', """
+        SELECT id, title, author_id, creation_dt FROM {table}
+        WHERE deleted_at IS NULL
+        ORDER BY creation_dt DESC LIMIT 100
+    """),
+    ('deep page', """
+        SELECT id, title, author_id, creation_dt FROM {table}
+        WHERE deleted_at IS NULL AND creation_dt <= :before
+          AND (creation_dt, id) < (:before, :before_id)
+        ORDER BY creation_dt DESC, id DESC LIMIT 100
+    """),
+    ('lookup by id', """
+        SELECT * FROM {table} WHERE id = :post_id AND deleted_at IS NULL
+    """),
+    ('lookup by id, dt', """
+        SELECT * FROM {table}
+        WHERE id = :post_id AND creation_dt = :post_dt AND deleted_at IS NULL
+    """),
+    ('one month count', """
+        SELECT count(*) FROM {table}
+        WHERE deleted_at IS NULL AND creation_dt >= :month_start AND creation_dt < :month_end
+    """),
+)
+
+
+async def create_tables(connection: AsyncConnection, first_month: datetime, months: int) -> None:
+    await connection.execute(text(f'CREATE SCHEMA {SCHEMA}'))
+    await connection.execute(text(
+        f'CREATE TABLE {SCHEMA}.heap ({COLUMNS}, PRIMARY KEY (id))'
+    ))
+    await connection.execute(text(
+        f'CREATE TABLE {SCHEMA}.partitioned ({COLUMNS}, PRIMARY KEY (id, creation_dt)) '
+        f'PARTITION BY RANGE (creation_dt)'
+    ))
+    for offset in range(months):
+        month_start = PostPartitionService.add_months(first_month, offset)
+        next_month = PostPartitionService.add_months(month_start, 1)
+        await connection.execute(text(
+            f'CREATE TABLE {SCHEMA}.partitioned_y{month_start:%Y}m{month_start:%m} '
+            f'PARTITION OF {SCHEMA}.partitioned '
+            f"FOR VALUES FROM ('{month_start:%Y-%m-%d}') TO ('{next_month:%Y-%m-%d}')"
+        ))
+
+
+async def fill_tables(connection: AsyncConnection, rows: int, first_month: datetime, months: int) -> None:
+    last_month = PostPartitionService.add_months(first_month, months)
+    span = (last_month - first_month).total_seconds()
+    await connection.execute(text(f"""
+        INSERT INTO {SCHEMA}.heap
+        SELECT gen_random_uuid(), 'Benchmark post ' || number, NULL, gen_random_uuid(),
+               :first_month + make_interval(secs => number * :step),
+               0, 0, CASE WHEN number % 50 = 0 THEN now() END
+        FROM generate_series(0, :rows - 1) AS number
+    """), {'first_month': first_month, 'step': span / rows, 'rows': rows})
+    await connection.execute(text(f'INSERT INTO {SCHEMA}.partitioned SELECT * FROM {SCHEMA}.heap'))
+    for table in ('heap', 'partitioned'):
+        await connection.execute(text(
+            f'CREATE INDEX ON {SCHEMA}.{table} (creation_dt, id) WHERE deleted_at IS NULL'
+        ))
+        await connection.execute(text(f'ANALYZE {SCHEMA}.{table}'))
+
+
+def scanned_relations(plan: dict) -> set[str]:
+    relations = set()
+    if plan.get('Actual Loops', 0) > 0 and 'Relation Name' in plan:
+        relations.add(plan['Relation Name'])
+    for child in plan.get('Plans', []):
+        relations |= scanned_relations(child)
+    return relations
+
+
+async def measure(
+    connection: AsyncConnection, query: str, params: dict, repeat: int
+) -> tuple[float, int]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await connection.execute(text(query), params)
+        timings.append(time.perf_counter() - started)
+    result = await connection.execute(text(f'EXPLAIN (ANALYZE, FORMAT JSON) {query}'), params)
+    [explain] = result.scalar()
+    return min(timings), len(scanned_relations(explain['Plan']))
+
+
+async def main(rows: int, months: int, repeat: int, keep: bool) -> None:
+    engine = create_async_engine(DATABASE_DSN)
+    current_month = PostPartitionService.get_month_start(datetime.now())
+    first_month = PostPartitionService.add_months(current_month, 1 - months)
+    middle_month = PostPartitionService.add_months(first_month, months // 2)
+    params = {
+        'before': middle_month,
+        'before_id': uuid.UUID(int=0),
+        'month_start': middle_month,
+        'month_end': PostPartitionService.add_months(middle_month, 1)
+    }
+    async with engine.connect() as connection:
+        await connection.execute(text(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE'))
+        await create_tables(connection, first_month, months)
+        started = time.perf_counter()
+        await fill_tables(connection, rows, first_month, months)
+        await connection.commit()
+        sample = (await connection.execute(text(
+            f'SELECT id, creation_dt FROM {SCHEMA}.heap WHERE creation_dt >= :before LIMIT 1'
+        ), params)).one()
+        params.update(post_id=sample.id, post_dt=sample.creation_dt)
+        print(f'Загружено {rows:,} строк за {time.perf_counter() - started:.0f} s')
+        print(f'{"query":<20}{"table":<14}{"best, ms":>10}{"relations":>12}')
+        try:
+            for name, query in QUERIES:
+                for table in ('heap', 'partitioned'):
+                    best, relations = await measure(
+                        connection, query.format(table=f'{SCHEMA}.{table}'), params, repeat
+                    )
+                    print(f'{name:<20}{table:<14}{best * 1000:>10.1f}{relations:>12}')
+        finally:
+            await connection.rollback()
+            if not keep:
+                await connection.execute(text(f'DROP SCHEMA {SCHEMA} CASCADE'))
+                await connection.commit()
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--months', type=int, default=36)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--keep', action='store_true', help='не удалять схему bench_partitions')
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.months, args.repeat, args.keep))
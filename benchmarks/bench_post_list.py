@@ -0,0 +1,107 @@
+"""
+Время и память списка постов: загрузка ORM-объектов целиком (select(Post)
+с содержимым) против проекции нужных колонок в Row-кортежи.
+
+Синтетические данные вставляются в одной транзакции, которая откатывается
+после замеров, поэтому база остаётся без изменений.
+
+    python -m benchmarks.bench_post_list [--posts 10000] [--content-size 4000]
+"""
+import argparse
+import asyncio
+import random
+import string
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import undefer
+
+from databases import DATABASE_DSN
+from src.models import Post, User
+from src.services.partition_service import PostPartitionService
+
+
+async def load_orm_objects(db_session: AsyncSession) -> list[dict]:
+    query = select(Post).options(undefer(Post.content)).filter(Post.deleted_at.is_(None))
+    result = await db_session.execute(query)
+    return [{
+        'id': str(post.id),
+        'title': post.title,
+        'author_id': str(post.author_id),
+        'creation_dt': post.creation_dt
+    } for post in result.scalars().all()]
+
+
+async def load_projection(db_session: AsyncSession) -> list[dict]:
+    query = (select(Post.id, Post.title, Post.author_id, Post.creation_dt).
+             filter(Post.deleted_at.is_(None)))
+    result = await db_session.execute(query)
+    return [{
+        'id': str(post.id),
+        'title': post.title,
+        'author_id': str(post.author_id),
+        'creation_dt': post.creation_dt
+    } for post in result.all()]
+
+
+async def insert_posts(db_session: AsyncSession, posts_number: int, content_size: int) -> None:
+    author_id = uuid.uuid4()
+    await db_session.execute(insert(User.__table__).values(
+        id=author_id,
+        login=f'bench-{author_id}',
+        hashed_password='-',
+        email=f'{author_id}@bench.local'
+    ))
+    content = ''.join(random.choices(string.ascii_letters + ' ', k=content_size))
+    # Все посты попадают в секцию текущего месяца, которая создаётся заранее.
+    started_at = PostPartitionService.get_month_start(datetime.now())
+    await db_session.execute(insert(Post.__table__), [{
+        'id': uuid.uuid4(),
+        'title': f'Benchmark post {number}',
+        'content': content,
+        'author_id': author_id,
+        'creation_dt': started_at + timedelta(seconds=number),
+        'likes_count': 0,
+        'dislikes_count': 0
+    } for number in range(posts_number)])
+
+
+async def measure(load, db_session: AsyncSession, repeat: int) -> tuple[float, int]:
+    timings = []
+    peak_memory = 0
+    for _ in range(repeat):
+        db_session.expunge_all()
+        tracemalloc.start()
+        started = time.perf_counter()
+        await load(db_session)
+        timings.append(time.perf_counter() - started)
+        peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return min(timings), peak_memory
+
+
+async def main(posts_number: int, content_size: int, repeat: int) -> None:
+    engine = create_async_engine(DATABASE_DSN)
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        db_session = AsyncSession(bind=connection, expire_on_commit=False)
+        await insert_posts(db_session, posts_number, content_size)
+        print(f'{"query":<20}{"best, ms":>12}{"peak memory, MiB":>20}')
+        for name, load in (('select(Post)', load_orm_objects), ('projection', load_projection)):
+            best, peak_memory = await measure(load, db_session, repeat)
+            print(f'{name:<20}{best * 1000:>12.1f}{peak_memory / 2 ** 20:>20.1f}')
+        await transaction.rollback()
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=10000)
+    parser.add_argument('--content-size', type=int, default=4000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.posts, args.content_size, args.repeat))
@@ -0,0 +1,84 @@
+"""
+Время холодного старта: импорт приложения (import main) в чистом
+интерпретаторе с -X importtime. Печатает медиану времени импорта
+и модули, на которые приходится больше всего собственного времени
+импорта, сгруппированные по пакетам верхнего уровня.
+
+Проверка регрессий: код возврата 1, если медиана превышает --budget-ms
+или при старте импортирован модуль, который должен загружаться лениво
+(werkzeug, uvicorn).
+
+    python -m benchmarks.bench_startup [--repeat 5] [--top 15] [--budget-ms 1500]
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from collections import Counter
+
+
+LAZY_MODULES = ('werkzeug', 'uvicorn')
+
+IMPORT_TIME_PATTERN = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+PROBE = (
+    'import sys, time\n'
+    'started = time.perf_counter()\n'
+    'import main\n'
+    'elapsed = time.perf_counter() - started\n'
+    'print(elapsed)\n'
+    'print(",".join(sorted(sys.modules)))\n'
+)
+
+
+def run_probe() -> tuple[float, set[str], str]:
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE],
+        capture_output=True, text=True, check=True
+    )
+    elapsed, modules = result.stdout.splitlines()[-2:]
+    return float(elapsed), set(modules.split(',')), result.stderr
+
+
+def self_time_by_package(importtime_log: str) -> Counter:
+    self_times: Counter = Counter()
+    for line in importtime_log.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match:
+            self_us, _, _, module = match.groups()
+            self_times[module.split('.')[0]] += int(self_us)
+    return self_times
+
+
+def main(repeat: int, top: int, budget_ms: float | None) -> int:
+    timings = []
+    self_times: Counter = Counter()
+    for _ in range(repeat):
+        elapsed, modules, importtime_log = run_probe()
+        timings.append(elapsed)
+        self_times += self_time_by_package(importtime_log)
+    median_ms = statistics.median(timings) * 1000
+    print(f'import main: median {median_ms:.0f} ms, min {min(timings) * 1000:.0f} ms ({repeat} runs)')
+    print(f'{"package":<24}{"self, ms":>10}')
+    for package, total_us in self_times.most_common(top):
+        print(f'{package:<24}{total_us / repeat / 1000:>10.1f}')
+
+    failed = False
+    eager_modules = [module for module in LAZY_MODULES if module in modules]
+    if eager_modules:
+        print(f'Импортированы при старте, хотя должны загружаться лениво: {", ".join(eager_modules)}')
+        failed = True
+    if budget_ms is not None and median_ms > budget_ms:
+        print(f'Время старта {median_ms:.0f} ms превышает бюджет {budget_ms:.0f} ms')
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--budget-ms', type=float, default=None)
+    args = parser.parse_args()
+    sys.exit(main(args.repeat, args.top, args.budget_ms))
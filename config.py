@@ -3,19 +3,78 @@ from pydantic import BaseSettings
 
 class Settings(BaseSettings):
     SERVICE_NAME: str = 'webtronics'
+    SERVER_HOST: str = '127.0.0.1'
+    SERVER_PORT: int = 8001
+    SERVER_WORKERS: int = 0  # 0 — по числу CPU
+    SERVER_TIMEOUT: int = 30  # seconds
+    SERVER_GRACEFUL_TIMEOUT: int = 30  # seconds
+    SERVER_KEEPALIVE: int = 5  # seconds
     DB_HOST: str = '127.0.0.1'
     DB_PORT: int = 5432
     DB_USER: str
     DB_PASSWORD: str
     DB_NAME: str = 'webtronics'
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_ECHO: bool = False
+    DB_SLOW_QUERY_THRESHOLD: int = 200  # milliseconds, 0 disables
+    DB_SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1
+    DB_SLOW_QUERY_MAX_STATEMENTS: int = 500
+    DB_SLOW_QUERY_ENDPOINT_ENABLED: bool = False
+    METRICS_ENDPOINT_ENABLED: bool = False
     REDIS_HOST: str = '127.0.0.1'
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
+    REDIS_CLUSTER: bool = False
+    REDIS_KEY_NAMESPACE: str = 'webtronics'
+    REDIS_CONNECT_TIMEOUT: int = 1000  # milliseconds
+    REDIS_COMMAND_TIMEOUT: int = 250  # milliseconds
+    REDIS_BREAKER_FAILURE_THRESHOLD: int = 5
+    REDIS_BREAKER_RESET_TIMEOUT: int = 5000  # milliseconds
     ACCESS_JWT_SECRET_KEY: str
     REFRESH_JWT_SECRET_KEY: str
     REFRESH_TOKEN_EXPIRES_IN: int  # days
     ACCESS_TOKEN_EXPIRES_IN: int  # days
-    JWT_ALGORITHM: str = 'HS256'
+    JWT_ALGORITHM: str = 'HS256'  # access tokens: HS256 | ES256 | EdDSA
+    JWT_REFRESH_ALGORITHM: str = 'HS256'
+    JWT_KEYS_DIR: str = 'keys'
+    JWT_ACTIVE_KID: str | None = None
+    JWT_KEYS_RELOAD_INTERVAL: int = 60  # seconds
+    JWT_KEYS_FORCED_RELOAD_INTERVAL: int = 5  # seconds
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_ENABLED: bool = True
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    POST_CACHE_EXPIRES_IN: int = 60  # seconds
+    POST_CACHE_EARLY_REFRESH_BETA: float = 1.0
+    POST_CACHE_LOCK_ENABLED: bool = True
+    POST_CACHE_LOCK_TIMEOUT: int = 5000  # milliseconds
+    POST_CACHE_LOCK_POLL_INTERVAL: int = 50  # milliseconds
+    EVENT_QUEUE_BACKEND: str = 'memory'  # memory | redis
+    EVENT_QUEUE_MAXSIZE: int = 1000
+    EVENT_QUEUE_WORKERS: int = 4
+    EVENT_QUEUE_DRAIN_TIMEOUT: int = 5  # seconds
+    EVENT_MAX_RETRIES: int = 3
+    EVENT_STREAM_NAME: str = 'events:post'
+    EVENT_STREAM_GROUP: str = 'webtronics'
+    EVENT_STREAM_MAXLEN: int = 100000
+    EVENT_STREAM_CLAIM_IDLE: int = 60000  # milliseconds
+    POST_PURGE_INTERVAL: int = 60  # seconds
+    POST_PURGE_BATCH_SIZE: int = 500
+    REACTIONS_LAYOUT: str = 'legacy'  # legacy | dual | compact
+    REACTIONS_BUCKET_KEY_LENGTH: int = 3  # hex characters of the post ID
+    POST_AUTHOR_BUCKET_KEY_LENGTH: int = 3  # hex characters of the post ID
+    POST_AUTHOR_LOCAL_CACHE_SIZE: int = 100000
+    POST_AUTHOR_LOCAL_TTL: int = 60  # seconds
+    POST_COUNTS_LOCAL_CACHE_SIZE: int = 100000
+    VIEW_FLUSH_INTERVAL: int = 500  # milliseconds
+    VIEW_BUFFER_MAXSIZE: int = 10000  # posts
+    POST_PARTITIONS_AHEAD: int = 3  # months
+    POST_PARTITION_CHECK_INTERVAL: int = 3600  # seconds
+    POSTS_PAGE_SIZE: int = 100
+    POSTS_MAX_PAGE_SIZE: int = 1000
+    LIVE_COUNTS_WINDOW: int = 250  # milliseconds
+    LIVE_HEARTBEAT_INTERVAL: int = 15  # seconds
     
     class Config:
         env_file = '.env'
@@ -1,9 +1,17 @@
+import os
+import time
+
 from redis.asyncio import client
+from redis.asyncio.cluster import RedisCluster
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
 
 from config import settings
+from src.circuit_breaker import CircuitBreaker
+from src.slow_queries import SlowQueryLog
 
 
 DATABASE_DSN: str = 'postgresql+asyncpg://{user}:{password}@{host}:{port}/{name}'.format(
@@ -14,22 +22,136 @@ DATABASE_DSN: str = 'postgresql+asyncpg://{user}:{password}@{host}:{port}/{name}
     name=settings.DB_NAME
 )
 
-async_engine: AsyncEngine = create_async_engine(DATABASE_DSN, echo=True, future=True)
+async_engine: AsyncEngine = create_async_engine(
+    DATABASE_DSN,
+    echo=settings.DB_ECHO,
+    future=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW
+)
+
+
+slow_query_log = SlowQueryLog(
+    DATABASE_DSN,
+    sample_rate=settings.DB_SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+    max_statements=settings.DB_SLOW_QUERY_MAX_STATEMENTS
+)
+
+
+if settings.DB_SLOW_QUERY_THRESHOLD > 0:
+    @event.listens_for(async_engine.sync_engine, 'before_cursor_execute')
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+        context.query_started_at = time.perf_counter()
 
+    @event.listens_for(async_engine.sync_engine, 'after_cursor_execute')
+    def log_slow_query(conn, cursor, statement, parameters, context, executemany) -> None:
+        duration = time.perf_counter() - context.query_started_at
+        if duration * 1000 >= settings.DB_SLOW_QUERY_THRESHOLD:
+            slow_query_log.record(statement, parameters, duration, executemany)
+
+
+class ReadOnlySession(Session):
+    pass
+
+
+@event.listens_for(ReadOnlySession, 'after_begin')
+def set_transaction_read_only(session, transaction, connection) -> None:
+    connection.exec_driver_sql('SET TRANSACTION READ ONLY')
+
+
+# Сессия не занимает соединение из пула до первого запроса, а режим
+# транзакции задаётся в момент её начала. Поэтому запросы, отклонённые
+# при авторизации или обслуженные из кэша, соединение не получают.
 async_session: AsyncSession = async_sessionmaker(async_engine, expire_on_commit=False)
 
+async_read_only_session: AsyncSession = async_sessionmaker(
+    async_engine, expire_on_commit=False, sync_session_class=ReadOnlySession
+)
+
 
 async def get_db_session() -> AsyncSession:
     async with async_session() as session:
         yield session 
 
 
-redis: client.Redis = client.Redis(
-    host=settings.REDIS_HOST,
-    port=settings.REDIS_PORT,
-    db=settings.REDIS_DB
+async def get_read_only_db_session() -> AsyncSession:
+    async with async_read_only_session() as session:
+        yield session
+
+
+redis: client.Redis | RedisCluster | None = None
+blocking_redis: client.Redis | RedisCluster | None = None
+
+redis_breaker = CircuitBreaker(
+    timeout=settings.REDIS_COMMAND_TIMEOUT / 1000,
+    failure_threshold=settings.REDIS_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.REDIS_BREAKER_RESET_TIMEOUT / 1000
 )
 
 
-async def get_redis() -> client.Redis:
+def create_redis(socket_timeout: float | None) -> client.Redis | RedisCluster:
+    """
+    При REDIS_CLUSTER узлы кластера определяются по адресу REDIS_HOST:REDIS_PORT,
+    а конвейеры группируют команды по узлам, владеющим слотами ключей.
+    """
+    if settings.REDIS_CLUSTER:
+        if settings.REACTIONS_LAYOUT != 'compact':
+            raise RuntimeError('Redis Cluster поддерживает только REACTIONS_LAYOUT=compact.')
+        return RedisCluster(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT / 1000,
+            socket_timeout=socket_timeout
+        )
+    return client.Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT / 1000,
+        socket_timeout=socket_timeout
+    )
+
+
+async def get_redis() -> client.Redis | RedisCluster:
+    """
+    Клиент Redis создаётся при первом обращении в каждом процессе,
+    поэтому воркеры, порождённые через fork, не делят соединения с мастером.
+    Ответ на любую команду ждётся не дольше REDIS_COMMAND_TIMEOUT, в том
+    числе вне redis_breaker: зависший Redis не задерживает запросы
+    и фоновые задачи дольше этого времени.
+    """
+    global redis
+    if redis is None:
+        redis = create_redis(socket_timeout=settings.REDIS_COMMAND_TIMEOUT / 1000)
     return redis
+
+
+async def get_blocking_redis() -> client.Redis | RedisCluster:
+    """
+    Клиент без ограничения времени ответа: для блокирующих чтений
+    (XREADGROUP BLOCK потребителя событий, pub/sub живых счётчиков)
+    и скриптов обслуживания с долгими командами.
+    """
+    global blocking_redis
+    if blocking_redis is None:
+        blocking_redis = create_redis(socket_timeout=None)
+    return blocking_redis
+
+
+async def close_connections() -> None:
+    global redis, blocking_redis
+    for cache in (redis, blocking_redis):
+        if cache is not None:
+            await cache.close()
+    redis = blocking_redis = None
+    await slow_query_log.close()
+    await async_engine.dispose()
+
+
+def reset_connections_after_fork() -> None:
+    global redis, blocking_redis
+    redis = blocking_redis = None
+    async_engine.sync_engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=reset_connections_after_fork)
@@ -0,0 +1,21 @@
+"""
+Запуск в production-режиме:
+
+    gunicorn -c gunicorn.conf.py main:app
+
+Каждый воркер импортирует приложение после fork и создаёт собственные
+пулы соединений с Postgres и Redis при старте.
+"""
+import multiprocessing
+
+from config import settings
+
+
+bind = f'{settings.SERVER_HOST}:{settings.SERVER_PORT}'
+workers = settings.SERVER_WORKERS or multiprocessing.cpu_count()
+worker_class = 'src.workers.ProductionUvicornWorker'
+preload_app = False
+timeout = settings.SERVER_TIMEOUT
+graceful_timeout = settings.SERVER_GRACEFUL_TIMEOUT
+keepalive = settings.SERVER_KEEPALIVE
+accesslog = '-'
@@ -1,11 +1,18 @@
-import uvicorn
 from fastapi import FastAPI, Request, status
 from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import HTTPException, RequestValidationError
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
 
 from config import settings
-from databases import get_db_session, get_redis
-from src.router import user_router, post_router
+from databases import close_connections, get_blocking_redis, get_redis
+from src import event_handlers  # noqa: F401
+from src.events import start_event_queue, stop_event_queue
+from src.jobs import start_jobs, stop_jobs
+from src.live import start_live_counts, stop_live_counts
+from src.middleware import CompressionMiddleware
+from src.router import user_router, post_router, service_router, well_known_router
+from src.views import start_view_recorder, stop_view_recorder
 
 
 app = FastAPI(
@@ -14,6 +21,10 @@ app = FastAPI(
     openapi_url='/api/openapi.json',
     default_response_class=ORJSONResponse)
 
+app.add_middleware(
+    CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE
+)
+
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(
@@ -35,28 +46,49 @@ async def http_exception_handler(
     )
 
 
+@app.exception_handler(RedisConnectionError)
+@app.exception_handler(RedisTimeoutError)
+async def redis_unavailable_exception_handler(
+    request: Request, exc: RedisConnectionError | RedisTimeoutError
+) -> ORJSONResponse:
+    return ORJSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"error": 'Сервис временно недоступен, повторите запрос позже.'},
+        headers={'Retry-After': str(max(1, settings.REDIS_BREAKER_RESET_TIMEOUT // 1000))}
+    )
+
+
 @app.on_event('startup')
 async def startup() -> None:
-    global redis, postgres
     redis = await get_redis()
-    async for session in get_db_session():
-        postgres = session
+    blocking_redis = await get_blocking_redis()
+    await start_event_queue(redis, blocking_redis)
+    await start_view_recorder(redis)
+    await start_live_counts(redis, blocking_redis)
+    await start_jobs()
 
 
 @app.on_event('shutdown')
 async def shutdown() -> None:
-    await redis.close()
-    await postgres.close()
+    await stop_jobs()
+    await stop_live_counts()
+    await stop_view_recorder()
+    await stop_event_queue()
+    await close_connections()
 
 
 app.include_router(user_router, prefix='/api/v1/auth/user', tags=['user'])
 app.include_router(post_router, prefix='/api/v1', tags=['post'])
+app.include_router(service_router, prefix='/api/v1/service', tags=['service'])
+app.include_router(well_known_router, prefix='/.well-known', tags=['service'])
 
 
 if __name__ == '__main__':
+    import uvicorn
+
     uvicorn.run(
         'main:app',
-        host='127.0.0.1',
-        port=8001, 
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
         reload=True
     )
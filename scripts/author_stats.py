@@ -0,0 +1,71 @@
+"""
+Пересчёт таблицы author_stats.
+
+Сначала счётчики лайков и дизлайков из Redis переносятся в колонки
+likes_count/dislikes_count таблицы post (нужно один раз после включения
+статистики и после потери событий POST_REACTED), затем сводная таблица
+заполняется заново одним агрегирующим запросом по post. Запускать
+в период низкой нагрузки: пересчёт идёт в одной транзакции.
+
+    python -m scripts.author_stats [--batch-size 1000] [--skip-sync]
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import bindparam, select, update
+
+from databases import async_session, close_connections, get_blocking_redis
+from src.models import Post
+from src.services.reaction_service import ReactionService
+from src.services.stats_service import AuthorStatsService
+
+
+async def sync_reaction_counts(batch_size: int) -> int:
+    cache = await get_blocking_redis()
+    post_table = Post.__table__
+    query = (update(post_table).
+             where(post_table.c.id == bindparam('post_id'),
+                   post_table.c.creation_dt == bindparam('post_creation_dt')).
+             values(likes_count=bindparam('likes'), dislikes_count=bindparam('dislikes')))
+    synced = 0
+    last_post_id = None
+    async with async_session() as db_session:
+        while True:
+            batch_query = (select(post_table.c.id, post_table.c.creation_dt).
+                           order_by(post_table.c.id).
+                           limit(batch_size))
+            if last_post_id is not None:
+                batch_query = batch_query.where(post_table.c.id > last_post_id)
+            posts = (await db_session.execute(batch_query)).all()
+            if not posts:
+                break
+            counts = await ReactionService.get_counts([str(post.id) for post in posts], cache)
+            await db_session.execute(query, [
+                {'post_id': post.id, 'post_creation_dt': post.creation_dt,
+                 'likes': likes, 'dislikes': dislikes}
+                for post, (likes, dislikes) in zip(posts, counts)
+            ])
+            await db_session.commit()
+            synced += len(posts)
+            last_post_id = posts[-1].id
+    return synced
+
+
+async def main(batch_size: int, skip_sync: bool) -> None:
+    try:
+        if not skip_sync:
+            synced = await sync_reaction_counts(batch_size)
+            print(f'Перенесено счётчиков реакций: {synced}.')
+        async with async_session() as db_session:
+            await AuthorStatsService.rebuild(db_session)
+        print('Таблица author_stats пересчитана.')
+    finally:
+        await close_connections()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--skip-sync', action='store_true', help='не переносить счётчики из Redis')
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size, args.skip_sync))
@@ -0,0 +1,241 @@
+"""
+Генерация синтетических данных для нагрузочных тестов и бенчмарков.
+
+Пользователи и посты загружаются в схему webtronics через COPY, реакции
+записываются в Redis конвейерами в текущей схеме REACTIONS_LAYOUT,
+а счётчики реакций дублируются в колонки likes_count/dislikes_count
+постов, после чего пересчитывается author_stats.
+
+Распределения:
+- авторство и популярность постов подчиняются закону Ципфа (параметр
+  --zipf): немногие авторы пишут большую часть постов, немногие посты
+  собирают большую часть реакций;
+- размер содержимого поста — логнормальный (медиана --content-median);
+- даты создания равномерно распределены по --months месяцам до --end-date.
+
+При одинаковых --seed и --end-date данные совпадают полностью, кроме соли
+хэша пароля. Все пользователи получают пароль --password (хэш считается
+один раз).
+
+    python -m scripts.generate_data --preset small [--seed 42]
+    python -m scripts.generate_data --users 10000 --posts 1000000 --reactions 5000000
+"""
+import argparse
+import asyncio
+import math
+import random
+import string
+import time
+import uuid
+from datetime import datetime
+from itertools import accumulate
+
+from redis.asyncio import client
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from config import settings
+from databases import async_engine, async_session, close_connections, get_blocking_redis
+from src.models import Post, User
+from src.services.partition_service import PostPartitionService
+from src.services.reaction_service import COMPACT, DISLIKE, DUAL, LEGACY, LIKE, ReactionService
+from src.services.stats_service import AuthorStatsService
+
+
+PRESETS = {
+    'small': (1_000, 10_000, 100_000),
+    'medium': (10_000, 1_000_000, 5_000_000),
+    'large': (100_000, 10_000_000, 50_000_000),
+}
+
+BATCH_SIZE = 10_000
+MAX_CONTENT_SIZE = 50_000
+
+
+def make_uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def zipf_cum_weights(size: int, exponent: float) -> list[float]:
+    return list(accumulate(1 / rank ** exponent for rank in range(1, size + 1)))
+
+
+def month_index(moment: datetime) -> int:
+    return moment.year * 12 + moment.month
+
+
+def make_text(rng: random.Random, size: int) -> str:
+    words = [
+        ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10)))
+        for _ in range(5000)
+    ]
+    text = []
+    length = 0
+    while length < size:
+        word = rng.choice(words)
+        text.append(word)
+        length += len(word) + 1
+    return ' '.join(text)
+
+
+class DatasetGenerator:
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.end_date = args.end_date
+        self.start_date = PostPartitionService.add_months(
+            PostPartitionService.get_month_start(args.end_date), 1 - args.months
+        )
+        self.user_ids: list[uuid.UUID] = []
+        self.text = make_text(self.rng, MAX_CONTENT_SIZE * 4)
+        zipf_total = sum(1 / rank ** args.zipf for rank in range(1, args.posts + 1))
+        self.reactions_per_rank = args.reactions / zipf_total
+
+    async def copy(self, connection: AsyncConnection, table, records: list[tuple]) -> None:
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            table.name,
+            schema_name=table.schema,
+            columns=[column.name for column in table.columns],
+            records=records
+        )
+
+    async def generate_users(self, connection: AsyncConnection) -> None:
+        from werkzeug.security import generate_password_hash
+
+        hashed_password = generate_password_hash(self.args.password)
+        prefix = f'{self.args.prefix}{self.args.seed}'
+        for start in range(0, self.args.users, BATCH_SIZE):
+            records = []
+            for number in range(start, min(start + BATCH_SIZE, self.args.users)):
+                user_id = make_uuid(self.rng)
+                self.user_ids.append(user_id)
+                login = f'{prefix}-{number}'
+                records.append((
+                    user_id, login, hashed_password, None, None, f'{login}@example.test'
+                ))
+            await self.copy(connection, User.__table__, records)
+
+    def make_reactions(self, rank: int) -> tuple[list[str], list[str]]:
+        expected = self.reactions_per_rank / rank ** self.args.zipf
+        count = min(
+            int(expected) + (self.rng.random() < expected % 1), len(self.user_ids)
+        )
+        reactors = [str(user_id) for user_id in self.rng.sample(self.user_ids, count)]
+        likes_number = sum(self.rng.random() < self.args.like_ratio for _ in reactors)
+        return reactors[:likes_number], reactors[likes_number:]
+
+    def make_post(
+        self, authors: list[uuid.UUID], author_weights: list[float], creation_dt: datetime
+    ) -> tuple:
+        [author_id] = self.rng.choices(authors, cum_weights=author_weights)
+        size = min(
+            int(self.rng.lognormvariate(math.log(self.args.content_median), 1.0)),
+            MAX_CONTENT_SIZE
+        )
+        offset = self.rng.randrange(len(self.text) - size)
+        title = self.text[offset:offset + self.rng.randint(10, 120)].strip().capitalize()
+        creation_dt = creation_dt.replace(microsecond=creation_dt.microsecond // 1000 * 1000)
+        post_id = PostPartitionService.make_post_id(creation_dt, self.rng.getrandbits(80))
+        return (
+            post_id, title or 'Post', self.text[offset:offset + size],
+            author_id, creation_dt
+        )
+
+    async def generate_posts(self, connection: AsyncConnection, cache: client.Redis) -> int:
+        # Ранги по Ципфу у авторов и постов случайные, чтобы активность
+        # не зависела от порядка создания.
+        authors = self.user_ids[:]
+        self.rng.shuffle(authors)
+        author_weights = zipf_cum_weights(len(authors), self.args.zipf)
+        ranks = list(range(1, self.args.posts + 1))
+        self.rng.shuffle(ranks)
+        step = (self.end_date - self.start_date) / max(self.args.posts, 1)
+        reactions_total = 0
+        for start in range(0, self.args.posts, BATCH_SIZE):
+            records = []
+            reactions = []
+            for number in range(start, min(start + BATCH_SIZE, self.args.posts)):
+                post = self.make_post(authors, author_weights, self.start_date + step * number)
+                likes, dislikes = self.make_reactions(ranks[number])
+                records.append((*post, len(likes), len(dislikes), None))
+                reactions.append((str(post[0]), likes, dislikes))
+                reactions_total += len(likes) + len(dislikes)
+            await self.copy(connection, Post.__table__, records)
+            await save_reactions(reactions, cache)
+        return reactions_total
+
+
+async def save_reactions(
+    reactions: list[tuple[str, list[str], list[str]]], cache: client.Redis
+) -> None:
+    layout = settings.REACTIONS_LAYOUT
+    async with cache.pipeline(transaction=False) as pipe:
+        for post_id, likes, dislikes in reactions:
+            for flag, user_ids in ((LIKE, likes), (DISLIKE, dislikes)):
+                if not user_ids:
+                    continue
+                if layout in (LEGACY, DUAL):
+                    pipe.set(ReactionService.get_legacy_counter_key(flag, post_id), len(user_ids))
+                    pipe.sadd(ReactionService.get_legacy_reactors_key(flag, post_id), *user_ids)
+                    for user_id in user_ids:
+                        pipe.rpush(ReactionService.get_legacy_user_key(flag, user_id), post_id)
+                if layout in (DUAL, COMPACT):
+                    pipe.hset(
+                        ReactionService.get_bucket_key(post_id),
+                        ReactionService.get_bucket_field(flag, post_id),
+                        len(user_ids)
+                    )
+                    pipe.sadd(ReactionService.get_reactors_key(flag, post_id), *user_ids)
+                    for user_id in user_ids:
+                        pipe.sadd(ReactionService.get_user_key(flag, user_id), post_id)
+        await pipe.execute()
+
+
+async def main(args: argparse.Namespace) -> None:
+    started = time.perf_counter()
+    generator = DatasetGenerator(args)
+    cache = await get_blocking_redis()
+    try:
+        current_month = month_index(datetime.now())
+        async with async_session() as db_session:
+            await PostPartitionService.create_partitions(
+                db_session,
+                months_ahead=max(0, month_index(args.end_date) - current_month),
+                months_back=max(0, current_month - month_index(generator.start_date))
+            )
+        async with async_engine.begin() as connection:
+            await generator.generate_users(connection)
+            reactions = await generator.generate_posts(connection, cache)
+        async with async_session() as db_session:
+            await AuthorStatsService.rebuild(db_session)
+    finally:
+        await close_connections()
+    print(
+        f'Пользователей: {args.users:,}, постов: {args.posts:,}, реакций: {reactions:,} '
+        f'за {time.perf_counter() - started:.0f} s.'
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--preset', choices=PRESETS, help='готовый размер набора: пользователи, посты, реакции')
+    parser.add_argument('--users', type=int, default=1_000)
+    parser.add_argument('--posts', type=int, default=10_000)
+    parser.add_argument('--reactions', type=int, default=100_000, help='ожидаемое общее число реакций')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--zipf', type=float, default=1.1, help='показатель распределения Ципфа')
+    parser.add_argument('--like-ratio', type=float, default=0.8, help='доля лайков среди реакций')
+    parser.add_argument('--content-median', type=int, default=800, help='медианный размер поста, символов')
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument(
+        '--end-date', type=datetime.fromisoformat,
+        default=datetime.now().replace(hour=0, minute=0, second=0, microsecond=0),
+        help='дата последнего поста, по умолчанию — начало текущих суток'
+    )
+    parser.add_argument('--prefix', default='synthetic', help='префикс логинов пользователей')
+    parser.add_argument('--password', default='synthetic-password')
+    args = parser.parse_args()
+    if args.preset:
+        args.users, args.posts, args.reactions = PRESETS[args.preset]
+    asyncio.run(main(args))
@@ -0,0 +1,43 @@
+"""
+Создание ключа подписи access-токенов для JWT_ALGORITHM=ES256 или EdDSA.
+
+Ротация ключей:
+1. python -m scripts.jwt_keys --algorithm EdDSA — новый ключ '<kid>.pem'
+   появляется в JWT_KEYS_DIR и (если JWT_ACTIVE_KID не задан) становится
+   ключом подписи после перечитывания набора ключей.
+2. Старые ключи остаются в каталоге и в /.well-known/jwks.json, пока
+   не истекут все подписанные ими токены (ACCESS_TOKEN_EXPIRES_IN), затем их файлы удаляются.
+"""
+import argparse
+import os
+from datetime import datetime
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+from config import settings
+
+
+def generate_key(algorithm: str, directory: str) -> str:
+    if algorithm == 'EdDSA':
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    kid = f'{algorithm.lower()}-{datetime.utcnow():%Y%m%d%H%M%S}'
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{kid}.pem')
+    with open(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'wb') as key_file:
+        key_file.write(private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ))
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--algorithm', choices=('EdDSA', 'ES256'), default='EdDSA')
+    parser.add_argument('--directory', default=settings.JWT_KEYS_DIR)
+    args = parser.parse_args()
+    print(generate_key(args.algorithm, args.directory))
@@ -0,0 +1,132 @@
+"""
+Переименование ключей Redis в схему с пространством имён и hash tag
+(src/redis_keys.py), с которой сервис может работать в Redis Cluster.
+
+Выполняется на одиночном Redis, сразу после выкладки версии с новой схемой
+ключей на все экземпляры сервиса (до этого момента кэш постов строится
+заново, а вход по старым сессиям не работает). RENAMENX сохраняет TTL
+и не затирает ключи, уже созданные новой версией. Отозванные access-токены
+переписываются в ключи пользователя по хэшу токена.
+
+Ключи старой схемы реакций (legacy) не переименовываются: перед переходом
+в кластер их нужно перенести в компактную схему (scripts.redis_reactions).
+После переименования данные переносятся в кластер обычными средствами
+(например, redis-cli --cluster import), и включается REDIS_CLUSTER.
+
+    python -m scripts.redis_keys migrate [--count 1000] [--dry-run]
+"""
+import argparse
+import asyncio
+import re
+from collections import Counter
+from typing import Callable
+
+import jwt
+from jwt import PyJWTError
+from redis.asyncio import client
+
+from config import settings
+from databases import get_blocking_redis
+from scripts.redis_reactions import UUID_PATTERN, scan_batches
+from src.redis_keys import make_key, post_tag, stream_tag, user_tag
+from src.services.token_service import TokenService
+
+
+RENAMES: tuple[tuple[str, str, Callable[[re.Match], str]], ...] = (
+    ('post:*', rf'^post:({UUID_PATTERN})$',
+     lambda match: make_key(post_tag(match[1]), 'cache')),
+    ('views:*', rf'^views:({UUID_PATTERN})$',
+     lambda match: make_key(post_tag(match[1]), 'views')),
+    ('viewers:*', rf'^viewers:({UUID_PATTERN})$',
+     lambda match: make_key(post_tag(match[1]), 'viewers')),
+    ('reactors:*', rf'^reactors:({UUID_PATTERN}):(like|dislike)$',
+     lambda match: make_key(post_tag(match[1]), 'reactors', match[2])),
+    ('user:*', rf'^user:({UUID_PATTERN}):(like|dislike)$',
+     lambda match: make_key(user_tag(match[1]), 'reactions', match[2])),
+    ('sessions:*', rf'^sessions:({UUID_PATTERN})$',
+     lambda match: make_key(user_tag(match[1]), 'sessions')),
+    ('reactions:*', r'^reactions:([^:]+)$',
+     lambda match: make_key('reactions', match[1])),
+    ('authors:*', r'^authors:([^:]+)$',
+     lambda match: make_key('authors', match[1])),
+    (settings.EVENT_STREAM_NAME, rf'^({re.escape(settings.EVENT_STREAM_NAME)})$',
+     lambda match: make_key(stream_tag(match[1]))),
+    (f'{settings.EVENT_STREAM_NAME}:dead', rf'^({re.escape(settings.EVENT_STREAM_NAME)}):dead$',
+     lambda match: make_key(stream_tag(match[1]), 'dead')),
+)
+
+
+async def rename_keys(cache: client.Redis, count: int, dry_run: bool) -> Counter:
+    renamed: Counter = Counter()
+    for match, pattern, make_new_key in RENAMES:
+        async for keys in scan_batches(cache, match, count):
+            renames = [
+                (key, make_new_key(key_match)) for key in keys
+                if (key_match := re.match(pattern, key))
+            ]
+            if dry_run or not renames:
+                renamed[match] += len(renames)
+                continue
+            async with cache.pipeline(transaction=False) as pipe:
+                for key, new_key in renames:
+                    pipe.renamenx(key, new_key)
+                results = await pipe.execute(raise_on_error=False)
+            renamed[match] += sum(result is True for result in results)
+            renamed['skipped'] += sum(result is not True for result in results)
+    return renamed
+
+
+async def rewrite_revoked_tokens(cache: client.Redis, count: int, dry_run: bool) -> Counter:
+    rewritten: Counter = Counter()
+    async for keys in scan_batches(cache, 'invalid:*', count):
+        async with cache.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.get(key)
+                pipe.ttl(key)
+            responses = iter(await pipe.execute())
+        async with cache.pipeline(transaction=False) as pipe:
+            for key in keys:
+                access_token, ttl = next(responses), next(responses)
+                if access_token is None or ttl <= 0:
+                    continue
+                try:
+                    claims = jwt.decode(access_token, options={'verify_signature': False})
+                    user_id = claims['sub']
+                except (PyJWTError, KeyError):
+                    rewritten['skipped'] += 1
+                    continue
+                pipe.setex(
+                    TokenService.get_revoked_access_token_key(user_id, access_token.decode()),
+                    ttl, 1
+                )
+                pipe.delete(key)
+                rewritten['invalid:*'] += 1
+            if not dry_run:
+                await pipe.execute()
+    return rewritten
+
+
+async def main(count: int, dry_run: bool) -> None:
+    if settings.REDIS_CLUSTER:
+        raise SystemExit('Переименование выполняется на одиночном Redis (REDIS_CLUSTER=false).')
+    cache = await get_blocking_redis()
+    try:
+        renamed = await rename_keys(cache, count, dry_run)
+        renamed += await rewrite_revoked_tokens(cache, count, dry_run)
+    finally:
+        await cache.close()
+    skipped = renamed.pop('skipped', 0)
+    for match, number in renamed.items():
+        print(f'{match:<24}{number:>10}')
+    print(f'{"skipped":<24}{skipped:>10}')
+    if dry_run:
+        print('Пробный запуск, ключи не изменены.')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=('migrate',))
+    parser.add_argument('--count', type=int, default=1000, help='размер шага SCAN')
+    parser.add_argument('--dry-run', action='store_true', help='только подсчитать ключи')
+    args = parser.parse_args()
+    asyncio.run(main(args.count, args.dry_run))
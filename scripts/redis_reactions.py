@@ -0,0 +1,197 @@
+"""
+Аудит памяти Redis и перенос реакций в компактную схему хранения.
+
+Порядок миграции без остановки сервиса:
+1. REACTIONS_LAYOUT=dual на всех экземплярах сервиса (запись в обе схемы,
+   чтение из компактной с откатом на старую).
+2. python -m scripts.redis_reactions migrate
+3. REACTIONS_LAYOUT=compact на всех экземплярах сервиса.
+4. python -m scripts.redis_reactions cleanup
+
+Отчёт о расходе памяти по семействам ключей:
+    python -m scripts.redis_reactions audit
+
+Перенос постов с ID в формате UUIDv7 из бакетов по началу ID в бакеты
+по его концу (src.redis_keys.bucket_id) для счётчиков реакций и кэша
+авторов. Выполняется сразу после выкладки версии с новым выбором бакета;
+счётчики, которые успели начаться в новом бакете, складываются с прежними:
+    python -m scripts.redis_reactions rebucket
+"""
+import argparse
+import asyncio
+import re
+from collections import Counter, defaultdict
+
+from redis.asyncio import client
+
+from config import settings
+from databases import get_blocking_redis
+from src.redis_keys import make_key
+from src.services.cache_service import PostAuthorCacheService
+from src.services.reaction_service import COMPACT, DUAL, ReactionService
+
+
+UUID_PATTERN = r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}'
+
+NAMESPACE = re.escape(settings.REDIS_KEY_NAMESPACE)
+
+KEY_FAMILIES = (
+    ('legacy post counters', rf'^(like|dislike):{UUID_PATTERN}$', 'string'),
+    ('legacy user reactions', rf'^(like|dislike):{UUID_PATTERN}$', 'list'),
+    ('legacy reactors', rf'^(like|dislike):{UUID_PATTERN}:users$', None),
+    ('reaction buckets', rf'^{NAMESPACE}:reactions:', None),
+    ('user reactions', rf'^{NAMESPACE}:\{{u:{UUID_PATTERN}\}}:reactions:', None),
+    ('reactors', rf'^{NAMESPACE}:\{{p:{UUID_PATTERN}\}}:reactors:', None),
+    ('post cache', rf'^{NAMESPACE}:\{{p:{UUID_PATTERN}\}}:cache$', None),
+    ('post views', rf'^{NAMESPACE}:\{{p:{UUID_PATTERN}\}}:views$', None),
+    ('post viewers', rf'^{NAMESPACE}:\{{p:{UUID_PATTERN}\}}:viewers$', None),
+    ('post authors', rf'^{NAMESPACE}:authors:', None),
+    ('sessions', rf'^{NAMESPACE}:\{{u:{UUID_PATTERN}\}}:sessions$', None),
+    ('revoked access tokens', rf'^{NAMESPACE}:\{{u:{UUID_PATTERN}\}}:revoked:', None),
+    ('event streams', rf'^{NAMESPACE}:\{{', 'stream'),
+)
+
+
+def classify_key(key: str, key_type: str) -> str:
+    for family, pattern, family_type in KEY_FAMILIES:
+        if re.match(pattern, key) and family_type in (None, key_type):
+            return family
+    return 'other'
+
+
+async def scan_batches(cache: client.Redis, match: str, count: int):
+    cursor = 0
+    while True:
+        cursor, keys = await cache.scan(cursor, match=match, count=count)
+        if keys:
+            yield [key.decode() for key in keys]
+        if cursor == 0:
+            break
+
+
+async def audit(cache: client.Redis, count: int) -> None:
+    keys_number: Counter = Counter()
+    memory: Counter = Counter()
+    encodings: dict[str, Counter] = defaultdict(Counter)
+    async for keys in scan_batches(cache, '*', count):
+        async with cache.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.type(key)
+                pipe.memory_usage(key)
+                pipe.object('encoding', key)
+            responses = await pipe.execute()
+        for number, key in enumerate(keys):
+            key_type, usage, encoding = responses[number * 3:number * 3 + 3]
+            key_type = key_type.decode() if isinstance(key_type, bytes) else key_type
+            family = classify_key(key, key_type)
+            keys_number[family] += 1
+            memory[family] += usage or 0
+            encodings[family][encoding.decode() if isinstance(encoding, bytes) else encoding] += 1
+    print(f'{"family":<24}{"keys":>10}{"bytes":>14}{"avg":>10}  encodings')
+    for family, total in memory.most_common():
+        average = total // keys_number[family]
+        encoding_summary = ', '.join(
+            f'{encoding}={number}' for encoding, number in encodings[family].most_common()
+        )
+        print(f'{family:<24}{keys_number[family]:>10}{total:>14}{average:>10}  {encoding_summary}')
+    print(f'{"total":<24}{sum(keys_number.values()):>10}{sum(memory.values()):>14}')
+
+
+async def migrate(cache: client.Redis, count: int) -> None:
+    migrated: Counter = Counter()
+    for flag in ('like', 'dislike'):
+        async for keys in scan_batches(cache, f'{flag}:*', count):
+            async with cache.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.type(key)
+                key_types = [key_type.decode() for key_type in await pipe.execute()]
+            async with cache.pipeline(transaction=False) as pipe:
+                for key, key_type in zip(keys, key_types):
+                    if key_type == 'string':
+                        pipe.get(key)
+                    elif key_type == 'list':
+                        pipe.lrange(key, 0, -1)
+                    else:
+                        pipe.smembers(key)
+                values = await pipe.execute()
+            async with cache.pipeline(transaction=False) as pipe:
+                for key, key_type, value in zip(keys, key_types, values):
+                    identifier = key.split(':')[1]
+                    if key_type == 'string' and value is not None:
+                        pipe.hsetnx(
+                            ReactionService.get_bucket_key(identifier),
+                            ReactionService.get_bucket_field(flag, identifier),
+                            int(value)
+                        )
+                    elif key_type == 'list' and value:
+                        pipe.sadd(ReactionService.get_user_key(flag, identifier), *value)
+                    elif key_type == 'set' and value:
+                        pipe.sadd(ReactionService.get_reactors_key(flag, identifier), *value)
+                    else:
+                        continue
+                    migrated[key_type] += 1
+                await pipe.execute()
+    print(
+        f"Перенесено счётчиков: {migrated['string']}, "
+        f"списков реакций пользователей: {migrated['list']}, "
+        f"множеств реагировавших: {migrated['set']}."
+    )
+
+
+async def cleanup(cache: client.Redis, count: int) -> None:
+    removed = 0
+    for flag in ('like', 'dislike'):
+        async for keys in scan_batches(cache, f'{flag}:*', count):
+            await cache.unlink(*keys)
+            removed += len(keys)
+    print(f'Удалено ключей старой схемы: {removed}.')
+
+
+async def rebucket(cache: client.Redis, count: int) -> None:
+    moved: Counter = Counter()
+    families = (
+        ('reactions', ReactionService.get_bucket_key, lambda field: field.partition(':')[2]),
+        ('authors', PostAuthorCacheService.get_bucket_key, lambda field: field),
+    )
+    for family, get_bucket_key, get_post_id in families:
+        async for keys in scan_batches(cache, make_key(family, '*'), count):
+            for key in keys:
+                fields = await cache.hgetall(key)
+                async with cache.pipeline(transaction=False) as pipe:
+                    for field, value in fields.items():
+                        field = field.decode()
+                        new_key = get_bucket_key(get_post_id(field))
+                        if new_key == key:
+                            continue
+                        if family == 'reactions':
+                            pipe.hincrby(new_key, field, int(value))
+                        else:
+                            pipe.hsetnx(new_key, field, value)
+                        pipe.hdel(key, field)
+                        moved[family] += 1
+                    await pipe.execute()
+    print(f"Перенесено счётчиков реакций: {moved['reactions']}, авторов постов: {moved['authors']}.")
+
+
+async def main(command: str, count: int, force: bool) -> None:
+    required_layout = {'migrate': DUAL, 'cleanup': COMPACT}.get(command)
+    if required_layout and settings.REACTIONS_LAYOUT != required_layout and not force:
+        raise SystemExit(
+            f'Команда {command} требует REACTIONS_LAYOUT={required_layout}, '
+            f'текущее значение: {settings.REACTIONS_LAYOUT}.'
+        )
+    cache = await get_blocking_redis()
+    try:
+        commands = {'audit': audit, 'migrate': migrate, 'cleanup': cleanup, 'rebucket': rebucket}
+        await commands[command](cache, count)
+    finally:
+        await cache.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=('audit', 'migrate', 'cleanup', 'rebucket'))
+    parser.add_argument('--count', type=int, default=1000, help='размер шага SCAN')
+    parser.add_argument('--force', action='store_true', help='не проверять REACTIONS_LAYOUT')
+    args = parser.parse_args()
+    asyncio.run(main(args.command, args.count, args.force))
@@ -0,0 +1,97 @@
+import asyncio
+import time
+from collections import Counter
+from typing import Awaitable, Callable, TypeVar
+
+from redis.exceptions import ConnectionError, TimeoutError
+
+
+T = TypeVar('T')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Ошибки, которые означают недоступность Redis, а не ошибку команды.
+UNAVAILABLE_ERRORS = (ConnectionError, TimeoutError, OSError)
+
+
+class CircuitOpenError(ConnectionError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Ограничение времени ожидания Redis. Каждая команда выполняется не дольше
+    timeout секунд; после failure_threshold отказов подряд цепь размыкается,
+    и вызовы сразу завершаются CircuitOpenError, не дожидаясь Redis.
+    Через reset_timeout секунд пропускается один пробный вызов: успех
+    замыкает цепь, отказ размыкает её снова.
+    """
+
+    def __init__(self, timeout: float, failure_threshold: int, reset_timeout: float) -> None:
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.metrics: Counter = Counter()
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.metrics['failures'] += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.metrics['opened'] += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def record_fallback(self, name: str) -> None:
+        self.metrics[f'fallback_{name}'] += 1
+
+    async def call(self, operation: Callable[[], Awaitable[T]]) -> T:
+        self.metrics['calls'] += 1
+        if not self.allow():
+            self.metrics['rejected'] += 1
+            raise CircuitOpenError('Redis недоступен.')
+        try:
+            result = await asyncio.wait_for(operation(), self.timeout)
+        except asyncio.TimeoutError:
+            self.metrics['timeouts'] += 1
+            self.record_failure()
+            raise TimeoutError(f'Redis не ответил за {self.timeout * 1000:.0f} ms.')
+        except UNAVAILABLE_ERRORS:
+            self.record_failure()
+            raise
+        except BaseException:
+            # Ответ с ошибкой команды или отмена запроса не говорят
+            # о недоступности Redis; пробный вызов можно повторить.
+            if self.state == HALF_OPEN:
+                self.state = OPEN
+            raise
+        self.record_success()
+        return result
+
+    def get_metrics(self) -> dict:
+        calls = self.metrics['calls']
+        fallbacks = sum(
+            number for name, number in self.metrics.items() if name.startswith('fallback_')
+        )
+        return {
+            'state': self.state,
+            'fallback_rate': round(fallbacks / calls, 4) if calls else 0.0,
+            **self.metrics
+        }
@@ -0,0 +1,55 @@
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from config import settings
+
+
+GZIP = 'gzip'
+BROTLI = 'br'
+IDENTITY = 'identity'
+
+
+def get_supported_encodings() -> tuple[str, ...]:
+    if brotli is not None and settings.COMPRESSION_BROTLI_ENABLED:
+        return BROTLI, GZIP
+    return (GZIP,)
+
+
+def choose_encoding(accept_encoding: str | None) -> str:
+    """
+    Выбирает кодировку из заголовка Accept-Encoding с учётом q-значений.
+    При равных весах предпочтение отдаётся brotli.
+    """
+    if not accept_encoding:
+        return IDENTITY
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[coding.strip().lower()] = quality
+    best_encoding, best_quality = IDENTITY, 0.0
+    for encoding in get_supported_encodings():
+        quality = weights.get(encoding, weights.get('*', 0.0))
+        if quality > best_quality:
+            best_encoding, best_quality = encoding, quality
+    return best_encoding
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == BROTLI:
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    if encoding == GZIP:
+        return gzip.compress(
+            body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0
+        )
+    return body
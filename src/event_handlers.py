@@ -0,0 +1,37 @@
+from fastapi import HTTPException
+
+from databases import async_session, get_redis
+from src.events import POST_CREATED, POST_DELETED, POST_REACTED, POST_UPDATED, Event, subscribe
+from src.live import mark_post_changed
+from src.services.cache_service import PostCacheService
+from src.services.post_service import PostService
+from src.services.stats_service import AuthorStatsService
+
+
+@subscribe(POST_CREATED)
+@subscribe(POST_UPDATED)
+async def warm_post_cache(event: Event) -> None:
+    cache = await get_redis()
+    post_id = event.payload['post_id']
+    try:
+        await PostService.build_post_payloads(post_id, cache)
+    except HTTPException:
+        return
+
+
+@subscribe(POST_DELETED)
+async def drop_post_cache(event: Event) -> None:
+    cache = await get_redis()
+    await PostCacheService.invalidate_post_payload(event.payload['post_id'], cache)
+
+
+@subscribe(POST_REACTED)
+async def persist_reaction(event: Event) -> None:
+    cache = await get_redis()
+    async with async_session() as db_session:
+        await AuthorStatsService.sync_reactions(event.payload['post_id'], db_session, cache)
+
+
+@subscribe(POST_REACTED)
+async def publish_live_counts(event: Event) -> None:
+    mark_post_changed(event.payload['post_id'])
@@ -0,0 +1,276 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from redis.asyncio import client
+from redis.exceptions import ResponseError
+
+from config import settings
+from src.redis_keys import make_key, stream_tag
+
+
+logger = logging.getLogger(__name__)
+
+POST_CREATED = 'post.created'
+POST_UPDATED = 'post.updated'
+POST_DELETED = 'post.deleted'
+POST_REACTED = 'post.reacted'
+
+
+@dataclass
+class Event:
+    name: str
+    payload: dict
+    attempt: int = 1
+
+
+EventHandler = Callable[[Event], Awaitable[None]]
+
+_handlers: dict[str, list[EventHandler]] = defaultdict(list)
+
+
+def subscribe(name: str) -> Callable[[EventHandler], EventHandler]:
+    def decorator(handler: EventHandler) -> EventHandler:
+        _handlers[name].append(handler)
+        return handler
+    return decorator
+
+
+async def dispatch(event: Event) -> None:
+    for handler in _handlers.get(event.name, []):
+        await handler(event)
+
+
+class InProcessEventQueue:
+    """
+    Очередь событий в памяти процесса с ограниченным размером и пулом воркеров.
+    При переполнении событие отбрасывается, чтобы не задерживать запрос.
+    """
+
+    def __init__(self, maxsize: int, workers: int, max_retries: int) -> None:
+        self.queue: asyncio.Queue[Event] = asyncio.Queue(maxsize=maxsize)
+        self.workers = workers
+        self.max_retries = max_retries
+        self.tasks: list[asyncio.Task] = []
+        self.metrics: Counter = Counter()
+
+    async def start(self) -> None:
+        self.tasks = [
+            asyncio.create_task(self._work()) for _ in range(self.workers)
+        ]
+
+    async def stop(self, timeout: float = 5) -> None:
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning('Event queue stopped with %d events left', self.queue.qsize())
+        for task in self.tasks:
+            task.cancel()
+        if self.tasks:
+            await asyncio.wait(self.tasks, timeout=timeout)
+
+    async def publish(self, name: str, payload: dict) -> None:
+        try:
+            self.queue.put_nowait(Event(name=name, payload=payload))
+            self.metrics['published'] += 1
+        except asyncio.QueueFull:
+            self.metrics['dropped'] += 1
+            logger.warning('Event queue is full, event %s dropped', name)
+
+    async def _work(self) -> None:
+        while True:
+            event = await self.queue.get()
+            try:
+                await dispatch(event)
+                self.metrics['processed'] += 1
+            except Exception:
+                logger.exception('Event %s failed, attempt %d', event.name, event.attempt)
+                self.metrics['failed'] += 1
+                if event.attempt < self.max_retries:
+                    event.attempt += 1
+                    self.metrics['retried'] += 1
+                    asyncio.get_running_loop().call_later(
+                        2 ** event.attempt, self._requeue, event
+                    )
+                else:
+                    self.metrics['dead_lettered'] += 1
+            finally:
+                self.queue.task_done()
+
+    def _requeue(self, event: Event) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.metrics['dropped'] += 1
+
+    def get_metrics(self) -> dict:
+        return {
+            'backend': 'memory',
+            'depth': self.queue.qsize(),
+            **self.metrics
+        }
+
+
+class RedisStreamEventQueue:
+    """
+    Надёжная очередь событий на Redis Streams с группой потребителей.
+    Неподтверждённые события упавших воркеров забираются через XAUTOCLAIM,
+    события, исчерпавшие попытки, переносятся в поток '<stream>:dead'.
+    Блокирующий XREADGROUP выполняется через отдельный клиент blocking_cache
+    без ограничения времени ответа, остальные команды — через общий клиент.
+    """
+
+    def __init__(
+        self,
+        cache: client.Redis,
+        blocking_cache: client.Redis,
+        stream: str,
+        group: str,
+        workers: int,
+        max_retries: int,
+        maxlen: int,
+        claim_idle: int
+    ) -> None:
+        self.cache = cache
+        self.blocking_cache = blocking_cache
+        self.stream = stream
+        self.dead_stream = f'{stream}:dead'
+        self.group = group
+        self.consumer = f'{socket.gethostname()}:{os.getpid()}'
+        self.workers = workers
+        self.max_retries = max_retries
+        self.maxlen = maxlen
+        self.claim_idle = claim_idle
+        self.tasks: list[asyncio.Task] = []
+        self.metrics: Counter = Counter()
+
+    async def start(self) -> None:
+        try:
+            await self.cache.xgroup_create(self.stream, self.group, id='0', mkstream=True)
+        except ResponseError as error:
+            if 'BUSYGROUP' not in str(error):
+                raise
+        self.tasks = [
+            asyncio.create_task(self._work(f'{self.consumer}:{number}'))
+            for number in range(self.workers)
+        ]
+
+    async def stop(self, timeout: float = 5) -> None:
+        for task in self.tasks:
+            task.cancel()
+        if self.tasks:
+            await asyncio.wait(self.tasks, timeout=timeout)
+
+    async def publish(self, name: str, payload: dict) -> None:
+        await self.cache.xadd(
+            self.stream,
+            {'name': name, 'payload': json.dumps(payload, default=str), 'attempt': 1},
+            maxlen=self.maxlen,
+            approximate=True
+        )
+        self.metrics['published'] += 1
+
+    async def _work(self, consumer: str) -> None:
+        while True:
+            try:
+                _, claimed, _ = await self.cache.xautoclaim(
+                    self.stream, self.group, consumer,
+                    min_idle_time=self.claim_idle, count=10
+                )
+                self.metrics['claimed'] += len(claimed)
+                for message_id, fields in claimed:
+                    await self._handle(message_id, fields)
+                response = await self.blocking_cache.xreadgroup(
+                    self.group, consumer, {self.stream: '>'}, count=10, block=1000
+                )
+                for _, messages in response:
+                    for message_id, fields in messages:
+                        await self._handle(message_id, fields)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Event stream consumer %s failed', consumer)
+                await asyncio.sleep(1)
+
+    async def _handle(self, message_id: bytes, fields: dict[bytes, bytes]) -> None:
+        if not fields:
+            await self.cache.xack(self.stream, self.group, message_id)
+            return
+        event = Event(
+            name=fields[b'name'].decode(),
+            payload=json.loads(fields[b'payload']),
+            attempt=int(fields.get(b'attempt', 1))
+        )
+        try:
+            await dispatch(event)
+            self.metrics['processed'] += 1
+        except Exception:
+            logger.exception('Event %s failed, attempt %d', event.name, event.attempt)
+            self.metrics['failed'] += 1
+            retry_stream = self.stream
+            if event.attempt < self.max_retries:
+                self.metrics['retried'] += 1
+            else:
+                retry_stream = self.dead_stream
+                self.metrics['dead_lettered'] += 1
+            await self.cache.xadd(
+                retry_stream,
+                {**fields, b'attempt': event.attempt + 1},
+                maxlen=self.maxlen,
+                approximate=True
+            )
+        async with self.cache.pipeline(transaction=False) as pipe:
+            pipe.xack(self.stream, self.group, message_id)
+            pipe.xdel(self.stream, message_id)
+            await pipe.execute()
+
+    def get_metrics(self) -> dict:
+        return {
+            'backend': 'redis',
+            'consumer': self.consumer,
+            **self.metrics
+        }
+
+
+EventQueue = InProcessEventQueue | RedisStreamEventQueue
+
+event_queue: EventQueue | None = None
+
+
+def create_event_queue(cache: client.Redis, blocking_cache: client.Redis) -> EventQueue:
+    if settings.EVENT_QUEUE_BACKEND == 'redis':
+        return RedisStreamEventQueue(
+            cache,
+            blocking_cache,
+            stream=make_key(stream_tag(settings.EVENT_STREAM_NAME)),
+            group=settings.EVENT_STREAM_GROUP,
+            workers=settings.EVENT_QUEUE_WORKERS,
+            max_retries=settings.EVENT_MAX_RETRIES,
+            maxlen=settings.EVENT_STREAM_MAXLEN,
+            claim_idle=settings.EVENT_STREAM_CLAIM_IDLE
+        )
+    return InProcessEventQueue(
+        maxsize=settings.EVENT_QUEUE_MAXSIZE,
+        workers=settings.EVENT_QUEUE_WORKERS,
+        max_retries=settings.EVENT_MAX_RETRIES
+    )
+
+
+async def start_event_queue(cache: client.Redis, blocking_cache: client.Redis) -> None:
+    global event_queue
+    event_queue = create_event_queue(cache, blocking_cache)
+    await event_queue.start()
+
+
+async def stop_event_queue() -> None:
+    if event_queue is not None:
+        await event_queue.stop(settings.EVENT_QUEUE_DRAIN_TIMEOUT)
+
+
+async def get_event_queue() -> EventQueue:
+    return event_queue
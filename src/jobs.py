@@ -0,0 +1,59 @@
+import asyncio
+import logging
+
+from config import settings
+from databases import async_session, get_redis
+from src.services.partition_service import PostPartitionService
+from src.services.post_service import PostService
+
+
+logger = logging.getLogger(__name__)
+
+_tasks: list[asyncio.Task] = []
+
+
+async def purge_deleted_posts_periodically() -> None:
+    cache = await get_redis()
+    while True:
+        try:
+            async with async_session() as db_session:
+                purged = await PostService.purge_deleted_posts(
+                    db_session, cache, settings.POST_PURGE_BATCH_SIZE
+                )
+            if purged:
+                logger.info('Purged %d deleted posts', purged)
+            if purged == settings.POST_PURGE_BATCH_SIZE:
+                continue
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception('Deleted posts purge failed')
+        await asyncio.sleep(settings.POST_PURGE_INTERVAL)
+
+
+async def create_post_partitions_periodically() -> None:
+    while True:
+        try:
+            async with async_session() as db_session:
+                created = await PostPartitionService.create_partitions(
+                    db_session, settings.POST_PARTITIONS_AHEAD
+                )
+            if created:
+                logger.info('Created post partitions: %s', ', '.join(created))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception('Post partitions creation failed')
+        await asyncio.sleep(settings.POST_PARTITION_CHECK_INTERVAL)
+
+
+async def start_jobs() -> None:
+    _tasks.append(asyncio.create_task(purge_deleted_posts_periodically()))
+    _tasks.append(asyncio.create_task(create_post_partitions_periodically()))
+
+
+async def stop_jobs() -> None:
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm
+
+from config import settings
+
+
+SYMMETRIC_ALGORITHMS = ('HS256', 'HS384', 'HS512')
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    algorithm: str
+    private_key: ec.EllipticCurvePrivateKey | ed25519.Ed25519PrivateKey
+    public_key: ec.EllipticCurvePublicKey | ed25519.Ed25519PublicKey
+    public_jwk: dict
+
+
+def load_signing_key(path: str) -> SigningKey:
+    with open(path, 'rb') as key_file:
+        private_key = serialization.load_pem_private_key(key_file.read(), password=None)
+    kid = os.path.splitext(os.path.basename(path))[0]
+    public_key = private_key.public_key()
+    if isinstance(private_key, ed25519.Ed25519PrivateKey):
+        algorithm = 'EdDSA'
+        public_jwk = OKPAlgorithm.to_jwk(public_key, as_dict=True)
+    elif isinstance(private_key, ec.EllipticCurvePrivateKey):
+        algorithm = 'ES256'
+        public_jwk = ECAlgorithm.to_jwk(public_key, as_dict=True)
+    else:
+        raise ValueError(f'Неподдерживаемый тип ключа: {path}')
+    public_jwk.update({'kid': kid, 'alg': algorithm, 'use': 'sig'})
+    return SigningKey(kid, algorithm, private_key, public_key, public_jwk)
+
+
+class JWTKeySet:
+    """
+    Набор ключей подписи access-токенов из каталога JWT_KEYS_DIR
+    (файлы '<kid>.pem'). Набор кэшируется в процессе и перечитывается
+    не чаще раза в JWT_KEYS_RELOAD_INTERVAL секунд или при встрече
+    неизвестного kid. Внеочередное перечитывание по kid из токена выполняется
+    не чаще раза в JWT_KEYS_FORCED_RELOAD_INTERVAL секунд, в промежутках
+    неизвестный kid сразу отклоняется: иначе токенами со случайными kid
+    можно заставить сервис перечитывать ключи на каждом запросе.
+    Подписывает ключ JWT_ACTIVE_KID, а если он не задан — самый новый файл;
+    остальные ключи используются только для проверки.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        active_kid: str | None,
+        reload_interval: int,
+        forced_reload_interval: int
+    ) -> None:
+        self.directory = directory
+        self.active_kid = active_kid
+        self.reload_interval = reload_interval
+        self.forced_reload_interval = forced_reload_interval
+        self.keys: dict[str, SigningKey] = {}
+        self.signing_kid: str | None = None
+        self.loaded_at = 0.0
+        self.forced_at = float('-inf')
+        self.lock = threading.Lock()
+
+    def load(self) -> None:
+        paths = sorted(
+            (os.path.join(self.directory, name) for name in os.listdir(self.directory)
+             if name.endswith('.pem')),
+            key=os.path.getmtime
+        )
+        keys = {key.kid: key for key in map(load_signing_key, paths)}
+        if not keys:
+            raise RuntimeError(f'В каталоге {self.directory} нет ключей подписи.')
+        signing_kid = self.active_kid or next(reversed(keys))
+        if signing_kid not in keys:
+            raise RuntimeError(f'Ключ {signing_kid} не найден в {self.directory}.')
+        self.keys, self.signing_kid = keys, signing_kid
+        self.loaded_at = time.monotonic()
+
+    def refresh(self) -> None:
+        if time.monotonic() - self.loaded_at > self.reload_interval:
+            with self.lock:
+                self.load()
+
+    def refresh_for_unknown_kid(self) -> None:
+        with self.lock:
+            if time.monotonic() - self.forced_at < self.forced_reload_interval:
+                return
+            self.forced_at = time.monotonic()
+            self.load()
+
+    def get_signing_key(self) -> SigningKey:
+        self.refresh()
+        return self.keys[self.signing_kid]
+
+    def get_verification_key(self, kid: str | None) -> SigningKey | None:
+        self.refresh()
+        if kid is not None and kid not in self.keys:
+            self.refresh_for_unknown_kid()
+        return self.keys.get(kid)
+
+    def get_jwks(self) -> dict:
+        self.refresh()
+        return {'keys': [key.public_jwk for key in self.keys.values()]}
+
+
+key_set = JWTKeySet(
+    settings.JWT_KEYS_DIR,
+    settings.JWT_ACTIVE_KID,
+    settings.JWT_KEYS_RELOAD_INTERVAL,
+    settings.JWT_KEYS_FORCED_RELOAD_INTERVAL
+)
+
+
+def encode_access_token(claims: dict) -> str:
+    if settings.JWT_ALGORITHM in SYMMETRIC_ALGORITHMS:
+        return jwt.encode(
+            claims, settings.ACCESS_JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM
+        )
+    signing_key = key_set.get_signing_key()
+    return jwt.encode(
+        claims,
+        signing_key.private_key,
+        algorithm=signing_key.algorithm,
+        headers={'kid': signing_key.kid}
+    )
+
+
+def decode_access_token(token: str) -> dict:
+    if settings.JWT_ALGORITHM in SYMMETRIC_ALGORITHMS:
+        return jwt.decode(
+            token, settings.ACCESS_JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
+        )
+    verification_key = key_set.get_verification_key(jwt.get_unverified_header(token).get('kid'))
+    if verification_key is None:
+        raise jwt.InvalidKeyError('Неизвестный kid.')
+    return jwt.decode(
+        token, verification_key.public_key, algorithms=[verification_key.algorithm]
+    )
+
+
+def get_jwks() -> dict:
+    if settings.JWT_ALGORITHM in SYMMETRIC_ALGORITHMS:
+        return {'keys': []}
+    return key_set.get_jwks()
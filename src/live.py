@@ -0,0 +1,174 @@
+import asyncio
+import contextlib
+import logging
+from collections import Counter, defaultdict
+from typing import AsyncIterator
+
+import orjson
+from fastapi import HTTPException
+from redis.asyncio import client
+
+from config import settings
+from src.redis_keys import make_key
+from src.services.reaction_service import ReactionService
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = make_key('live', '')
+CONTROL_CHANNEL = f'{CHANNEL_PREFIX}control'
+
+
+class LiveCountsHub:
+    """
+    Живые счётчики лайков и дизлайков через Redis pub/sub.
+
+    Публикация: изменённые посты копятся в памяти процесса, и раз в
+    LIVE_COUNTS_WINDOW миллисекунд для них одним конвейером читаются счётчики
+    и публикуются в каналы '<ns>:live:{post_id}', то есть не чаще одного сообщения
+    на пост за окно, сколько бы реакций ни пришло.
+    Подписка: у воркера одно соединение pub/sub, которое подписано только на
+    посты с подключёнными клиентами, и сообщение из канала раздаётся всем
+    локальным клиентам поста. Очередь клиента хранит лишь последнее значение,
+    поэтому медленный клиент пропускает промежуточные счётчики.
+    Подписка идёт через отдельный клиент blocking_cache без ограничения
+    времени ответа, публикация — через общий клиент.
+    """
+
+    def __init__(self, cache: client.Redis, blocking_cache: client.Redis, window: float) -> None:
+        self.cache = cache
+        self.blocking_cache = blocking_cache
+        self.window = window
+        self.pubsub: client.PubSub | None = None
+        self.listeners: dict[str, set[asyncio.Queue]] = defaultdict(set)
+        self.changed: set[str] = set()
+        self.tasks: list[asyncio.Task] = []
+        self.metrics: Counter = Counter()
+
+    @staticmethod
+    def get_channel(post_id: str) -> str:
+        return f'{CHANNEL_PREFIX}{post_id}'
+
+    async def start(self) -> None:
+        self.pubsub = self.blocking_cache.pubsub(ignore_subscribe_messages=True)
+        # Служебная подписка держит соединение открытым, пока нет клиентов.
+        await self.pubsub.subscribe(CONTROL_CHANNEL)
+        self.tasks = [
+            asyncio.create_task(self._receive()),
+            asyncio.create_task(self._publish_periodically())
+        ]
+
+    async def stop(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        if self.pubsub is not None:
+            await self.pubsub.close()
+
+    def mark_changed(self, post_id: str) -> None:
+        self.changed.add(post_id)
+
+    @contextlib.asynccontextmanager
+    async def listen(self, post_id: str) -> AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        listeners = self.listeners[post_id]
+        first_listener = not listeners
+        listeners.add(queue)
+        self.metrics['connected'] += 1
+        try:
+            if first_listener:
+                await self.pubsub.subscribe(self.get_channel(post_id))
+            yield queue
+        finally:
+            listeners.discard(queue)
+            self.metrics['disconnected'] += 1
+            if not listeners:
+                del self.listeners[post_id]
+                await self.pubsub.unsubscribe(self.get_channel(post_id))
+
+    async def publish(self) -> None:
+        if not self.changed:
+            return
+        post_ids, self.changed = list(self.changed), set()
+        counts = await ReactionService.get_counts(post_ids, self.cache)
+        async with self.cache.pipeline(transaction=False) as pipe:
+            for post_id, (like_count, dislike_count) in zip(post_ids, counts):
+                pipe.publish(
+                    self.get_channel(post_id),
+                    orjson.dumps({'like_count': like_count, 'dislike_count': dislike_count})
+                )
+            await pipe.execute()
+        self.metrics['published'] += len(post_ids)
+
+    async def _publish_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.window)
+            try:
+                await self.publish()
+            except Exception:
+                logger.exception('Live counts publish failed')
+
+    async def _receive(self) -> None:
+        while True:
+            try:
+                message = await self.pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Live counts subscription failed')
+                await asyncio.sleep(1)
+                continue
+            if message is None or message['type'] != 'message':
+                continue
+            post_id = message['channel'].decode()[len(CHANNEL_PREFIX):]
+            self.metrics['received'] += 1
+            for queue in self.listeners.get(post_id, ()):
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(message['data'])
+
+    def get_metrics(self) -> dict:
+        return {
+            'posts': len(self.listeners),
+            'clients': sum(len(listeners) for listeners in self.listeners.values()),
+            **self.metrics
+        }
+
+
+live_counts: LiveCountsHub | None = None
+
+
+async def start_live_counts(cache: client.Redis, blocking_cache: client.Redis) -> None:
+    global live_counts
+    hub = LiveCountsHub(cache, blocking_cache, window=settings.LIVE_COUNTS_WINDOW / 1000)
+    try:
+        await hub.start()
+    except Exception:
+        # Без живых счётчиков сервис работает: поток счётчиков отвечает 503,
+        # остальные запросы обслуживаются как обычно.
+        logger.exception('Live counts hub failed to start')
+        await hub.stop()
+        return
+    live_counts = hub
+
+
+async def stop_live_counts() -> None:
+    if live_counts is not None:
+        await live_counts.stop()
+
+
+def mark_post_changed(post_id: str) -> None:
+    if live_counts is not None:
+        live_counts.mark_changed(post_id)
+
+
+def get_live_counts_metrics() -> dict | None:
+    return live_counts.get_metrics() if live_counts is not None else None
+
+
+async def get_live_counts() -> LiveCountsHub:
+    if live_counts is None:
+        raise HTTPException(status_code=503, detail='Живые счётчики временно недоступны.')
+    return live_counts
@@ -0,0 +1,69 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.compression import IDENTITY, choose_encoding, compress
+
+
+class CompressionMiddleware:
+    """
+    Сжимает ответы gzip или brotli, если тело ответа не меньше minimum_size.
+    Потоковые ответы и ответы, уже имеющие Content-Encoding
+    (например, заранее сжатые посты из кэша), передаются без изменений.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get('accept-encoding'))
+        if encoding == IDENTITY:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self.app, encoding, self.minimum_size)
+        await responder(scope, receive, send)
+
+
+class _CompressionResponder:
+
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int) -> None:
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Send
+        self.start_message: Message | None = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_wrapper)
+
+    async def send_wrapper(self, message: Message) -> None:
+        if message['type'] == 'http.response.start':
+            headers = Headers(raw=message['headers'])
+            self.passthrough = (
+                'content-encoding' in headers
+                or headers.get('content-type', '').startswith('text/event-stream')
+            )
+            self.start_message = message
+            return
+        if message['type'] != 'http.response.body' or self.start_message is None:
+            await self.send(message)
+            return
+        start_message, self.start_message = self.start_message, None
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+        if self.passthrough or more_body or len(body) < self.minimum_size:
+            await self.send(start_message)
+            await self.send(message)
+            return
+        compressed_body = compress(body, self.encoding)
+        headers = MutableHeaders(raw=start_message['headers'])
+        headers['Content-Encoding'] = self.encoding
+        headers['Content-Length'] = str(len(compressed_body))
+        headers.add_vary_header('Accept-Encoding')
+        await self.send(start_message)
+        await self.send({'type': 'http.response.body', 'body': compressed_body})
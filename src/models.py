@@ -2,11 +2,11 @@ import uuid
 from datetime import datetime
 
 from sqlalchemy import MetaData
-from sqlalchemy import (Column, DateTime, ForeignKey,
-                        Integer, String, Text)
+from sqlalchemy import (Column, DateTime, ForeignKey, Index,
+                        Integer, String, Text, text)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 
 metadata_obj = MetaData(schema="webtronics")
@@ -44,18 +44,37 @@ class User(Base):
 
 class Post(Base):
     __tablename__ = 'post'
+    __table_args__ = (
+        Index(
+            'ix_post_creation_dt_id_alive', 'creation_dt', 'id',
+            postgresql_where=text('deleted_at IS NULL')
+        ),
+        Index(
+            'ix_post_author_id_creation_dt_alive', 'author_id', 'creation_dt',
+            postgresql_where=text('deleted_at IS NULL')
+        ),
+        Index(
+            'ix_post_deleted_at', 'deleted_at',
+            postgresql_where=text('deleted_at IS NOT NULL')
+        ),
+        # Помесячные секции post_yYYYYmMM создаются миграцией
+        # и фоновой задачей PostPartitionService.create_partitions.
+        {'postgresql_partition_by': 'RANGE (creation_dt)'},
+    )
 
+    # Ключ секционирования обязан входить в первичный ключ.
     id = Column(
         UUID(as_uuid=True), primary_key=True,
-        default=uuid.uuid4, unique=True, nullable=False
+        default=uuid.uuid4, nullable=False
     )
     title = Column(String(120), nullable=False)
-    content = Column(Text())
+    content = deferred(Column(Text()))
     author_id = Column(ForeignKey('user.id'), nullable=False)
     author = relationship('User')
-    creation_dt = Column(DateTime, default=datetime.now)
+    creation_dt = Column(DateTime, primary_key=True, default=datetime.now, nullable=False)
     likes_count = Column (Integer, default=0)
     dislikes_count = Column (Integer, default=0)
+    deleted_at = Column(DateTime, nullable=True)
 
     def __init__(self, title: str, content: str, author_id: User) -> None:
         self.title = title
@@ -64,3 +83,16 @@ class Post(Base):
 
     def __repr__(self) -> str:
         return f'<Post {self.title}>'
+
+
+class AuthorStats(Base):
+    __tablename__ = 'author_stats'
+
+    author_id = Column(ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    post_count = Column(Integer, nullable=False, server_default='0')
+    likes_count = Column(Integer, nullable=False, server_default='0')
+    dislikes_count = Column(Integer, nullable=False, server_default='0')
+    last_post_dt = Column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return f'<AuthorStats {self.author_id}>'
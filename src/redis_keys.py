@@ -0,0 +1,44 @@
+"""
+Схема ключей Redis.
+
+Все ключи сервиса начинаются с пространства имён REDIS_KEY_NAMESPACE.
+Ключи, которые участвуют в одной транзакции, скрипте или многоключевой
+команде, содержат общий hash tag — часть в фигурных скобках, по которой
+Redis Cluster выбирает слот:
+
+- '{p:<post_id>}' — кэш ответа поста, блокировка его пересборки,
+  просмотры и множества отреагировавших;
+- '{u:<user_id>}' — сессии, отозванные access-токены и реакции пользователя;
+- '{<имя потока>}' — поток событий и его dead letter.
+
+Hash-бакеты реакций и авторов — одиночные ключи без тега; номер бакета
+берётся из случайных символов ID поста (bucket_id). Ключи старой
+схемы реакций (legacy) пространства имён не используют, поэтому
+в кластере допустим только REACTIONS_LAYOUT=compact.
+"""
+from config import settings
+
+
+def make_key(*parts: str) -> str:
+    return ':'.join((settings.REDIS_KEY_NAMESPACE, *parts))
+
+
+def post_tag(post_id: str) -> str:
+    return f'{{p:{post_id}}}'
+
+
+def user_tag(user_id: str) -> str:
+    return f'{{u:{user_id}}}'
+
+
+def stream_tag(stream: str) -> str:
+    return f'{{{stream}}}'
+
+
+def bucket_id(post_id: str, length: int) -> str:
+    # В UUIDv7 первые символы — время создания, и все посты за годы попали бы
+    # в пару бакетов; поэтому для них берётся конец ID (случайные биты).
+    # У UUIDv4 случайно всё, и старые посты остаются в прежних бакетах.
+    if post_id[14:15] == '7':
+        return post_id[-length:]
+    return post_id[:length]
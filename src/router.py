@@ -1,24 +1,36 @@
+import uuid
+from datetime import datetime
 from typing import Annotated
 
-from fastapi import Depends, Header
+from fastapi import Depends, Header, HTTPException, Query, Request
 from fastapi import APIRouter
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
 from redis import client
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from databases import get_db_session, get_redis
-from src.services.post_service import PostService
+from config import settings
+from databases import get_db_session, get_read_only_db_session, get_redis, redis_breaker, slow_query_log
+from src.events import EventQueue, get_event_queue
+from src.jwt_keys import get_jwks
+from src.live import LiveCountsHub, get_live_counts, get_live_counts_metrics
+from src.services.post_service import PostService, post_loads
+from src.services.stats_service import AuthorStatsService
 from src.services.user_service import UserService
 from src.schemas import (PostDeleteResponse, PostUpdateResponse,
                          Token, UserRegistration, UserLogin)
-from src.schemas import PostBase, PostDB, Posts, PostSingle
+from src.schemas import AuthorStatsResponse, PostBase, PostDB, Posts, PostSingle
 from src.services.token_service import TokenService
+from src.views import ViewRecorder, get_view_recorder
 
 
 user_router = APIRouter()
 
 post_router = APIRouter()
 
+service_router = APIRouter()
+
+well_known_router = APIRouter()
+
 
 @user_router.post(
     '/registration', status_code=201, summary='Регистрация нового пользователя.'
@@ -36,14 +48,17 @@ async def register_user(
 @user_router.post('/login', status_code=200, summary='Вход в учётную запись.')
 async def login_user(
     user: UserLogin,
-    db_session: AsyncSession = Depends(get_db_session),
+    x_device_id: Annotated[str | None, Header()] = None,
+    db_session: AsyncSession = Depends(get_read_only_db_session),
     cache: client.Redis = Depends(get_redis)
 ) -> JSONResponse:
     """
     Возвращает строку с уведомлением об успешной аутентификации.
     Заголовки 'X-Access-Token' и 'X-Refresh-Token' содержат соответствующие токены.
+    Необязательный заголовок 'X-Device-Id' задаёт ID сессии: повторный вход
+    с того же устройства заменяет его сессию, не затрагивая остальные.
     """
-    success, headers = await UserService.login_user(user, db_session, cache)
+    success, headers = await UserService.login_user(user, x_device_id, db_session, cache)
     return JSONResponse(content=success, headers=headers)
 
 
@@ -88,20 +103,33 @@ async def refresh_tokens(
     '/post', response_model=Posts, status_code=200, summary='Просмотр списка постов.'
 )
 async def get_posts(
-    db_session: AsyncSession = Depends(get_db_session),
+    before: datetime | None = None,
+    before_id: uuid.UUID | None = None,
+    limit: Annotated[int, Query(ge=1, le=settings.POSTS_MAX_PAGE_SIZE)] = settings.POSTS_PAGE_SIZE,
+    authorization: Annotated[str | None, Header()] = None,
+    db_session: AsyncSession = Depends(get_read_only_db_session),
     cache: client.Redis = Depends(get_redis)
 ) -> Posts:
     """
-    Возвращает список постов с параметрами:
+    Возвращает не более **limit** постов, предшествующих курсору
+    (**before**, **before_id**), от новых к старым. Следующая страница
+    запрашивается с **before** и **before_id**, равными creation_dt и id
+    последнего поста страницы. Без **before_id** возвращаются посты,
+    созданные строго раньше **before**.
+
+    Параметры постов:
     - **id**: ID поста
     - **title**: название поста
     - **author_id**: ID автора поста
     - **creation_dt**: дата и время создания поста
     - **like_count**: количество лайков поста
     - **dislike_count**: количество дизлайков поста
+    - **my_reaction**: реакция текущего пользователя ('like', 'dislike' или null),
+      если передан заголовок Authorization
+    - **stale**: счётчики или реакция взяты из запасных источников, пока Redis недоступен
 
     """
-    posts = await PostService.get_posts(db_session, cache)
+    posts = await PostService.get_posts(authorization, before, before_id, limit, db_session, cache)
     return Posts(posts=posts)
 
 
@@ -113,9 +141,12 @@ async def get_posts(
 )
 async def get_post(
     post_id: str,
-    db_session: AsyncSession = Depends(get_db_session),
-    cache: client.Redis = Depends(get_redis)
-) -> PostSingle:
+    request: Request,
+    accept_encoding: Annotated[str | None, Header()] = None,
+    authorization: Annotated[str | None, Header()] = None,
+    cache: client.Redis = Depends(get_redis),
+    views: ViewRecorder = Depends(get_view_recorder)
+) -> Response:
     """
     Возвращает список постов с параметрами:
     - **title**: название поста
@@ -124,10 +155,39 @@ async def get_post(
     - **creation_dt**: дата и время создания поста
     - **like_count**: количество лайков поста
     - **dislike_count**: количество дизлайков поста
+    - **my_reaction**: реакция текущего пользователя ('like', 'dislike' или null),
+      если передан заголовок Authorization
+    - **view_count**: количество просмотров поста
+    - **unique_view_count**: примерное количество уникальных зрителей
+    - **stale**: счётчики или реакция взяты из запасных источников, пока Redis недоступен
 
     """
-    post = await PostService.get_post(post_id, db_session, cache)
-    return post
+    return await PostService.get_post_response(
+        post_id, accept_encoding, authorization,
+        request.client.host if request.client else None,
+        cache, views
+    )
+
+
+@post_router.get(
+    '/post/{post_id}/events',
+    status_code=200,
+    summary='Поток живых счётчиков лайков и дизлайков поста.'
+)
+async def get_post_events(
+    post_id: str,
+    db_session: AsyncSession = Depends(get_read_only_db_session),
+    cache: client.Redis = Depends(get_redis),
+    live: LiveCountsHub = Depends(get_live_counts)
+) -> StreamingResponse:
+    """
+    Возвращает поток Server-Sent Events. Сразу после подключения и при
+    каждом изменении счётчиков приходит событие **counts** с данными
+    {"like_count": ..., "dislike_count": ...}; изменения объединяются
+    в окне LIVE_COUNTS_WINDOW миллисекунд. В первом событии есть также поле
+    **stale**: счётчики взяты из запасных источников, пока Redis недоступен.
+    """
+    return await PostService.get_post_counts_stream(post_id, db_session, cache, live)
 
 
 @post_router.post(
@@ -136,7 +196,9 @@ async def get_post(
 async def create_post(
     post: PostBase,
     authorization: Annotated[str, Header()],
-    db_session: AsyncSession = Depends(get_db_session)
+    db_session: AsyncSession = Depends(get_db_session),
+    cache: client.Redis = Depends(get_redis),
+    events: EventQueue = Depends(get_event_queue)
     ) -> PostDB:
     """
     Возвращает информацию о созданном посте с параметрами:
@@ -146,7 +208,9 @@ async def create_post(
     - **creation_dt**: дата и время создания поста
 
     """
-    response = await PostService.create_and_publish_post(post, authorization, db_session)
+    response = await PostService.create_and_publish_post(
+        post, authorization, db_session, cache, events
+    )
     return response
 
 
@@ -160,14 +224,18 @@ async def update_post(
     post_id: str,
     post: PostBase,
     authorization: Annotated[str, Header()],
-    db_session: AsyncSession = Depends(get_db_session)
+    db_session: AsyncSession = Depends(get_db_session),
+    cache: client.Redis = Depends(get_redis),
+    events: EventQueue = Depends(get_event_queue)
 ) -> PostUpdateResponse:
     """
     Возвращает информацию об изменённом посте с параметрами:
     - **title**: название поста
 
     """
-    response = await PostService.update_post(post_id, post, authorization, db_session)
+    response = await PostService.update_post(
+        post_id, post, authorization, db_session, cache, events
+    )
     return response
 
 
@@ -180,14 +248,18 @@ async def update_post(
 async def delete_post(
     post_id: str,
     authorization: Annotated[str, Header()],
-    db_session: AsyncSession = Depends(get_db_session)
+    db_session: AsyncSession = Depends(get_db_session),
+    cache: client.Redis = Depends(get_redis),
+    events: EventQueue = Depends(get_event_queue)
 ) -> PostDeleteResponse:
     """
     Возвращает информацию об удалённом посте с параметрами:
     - **id**: ID поста
 
     """
-    response = await PostService.delete_post(post_id, authorization, db_session)
+    response = await PostService.delete_post(
+        post_id, authorization, db_session, cache, events
+    )
     return response
 
 
@@ -197,14 +269,15 @@ async def delete_post(
 async def like_post(
     post_id: str,
     authorization: Annotated[str, Header()],
-    db_session: AsyncSession = Depends(get_db_session),
-    cache: client.Redis = Depends(get_redis)
+    db_session: AsyncSession = Depends(get_read_only_db_session),
+    cache: client.Redis = Depends(get_redis),
+    events: EventQueue = Depends(get_event_queue)
 ) -> str:
     """
     Возвращает строку с уведомлением об успешном добавлении лайка.
     """
     success = await PostService.like_post(
-        post_id, authorization, db_session, cache
+        post_id, authorization, db_session, cache, events
     )
     return success
 
@@ -215,13 +288,83 @@ async def like_post(
 async def dislike_post(
     post_id: str,
     authorization: Annotated[str, Header()],
-    db_session: AsyncSession = Depends(get_db_session),
-    cache: client.Redis = Depends(get_redis)
+    db_session: AsyncSession = Depends(get_read_only_db_session),
+    cache: client.Redis = Depends(get_redis),
+    events: EventQueue = Depends(get_event_queue)
 ) -> str:
     """
     Возвращает строку с уведомлением об успешном добавлении дизлайка.
     """
     success = await PostService.dislike_post(
-        post_id, authorization, db_session, cache
+        post_id, authorization, db_session, cache, events
     )
     return success
+
+
+@post_router.get(
+    '/user/{user_id}/stats',
+    response_model=AuthorStatsResponse,
+    status_code=200,
+    summary='Статистика автора.'
+)
+async def get_author_stats(
+    user_id: uuid.UUID,
+    db_session: AsyncSession = Depends(get_read_only_db_session)
+) -> AuthorStatsResponse:
+    """
+    Возвращает статистику автора с параметрами:
+    - **author_id**: ID автора
+    - **post_count**: количество постов
+    - **like_count**: суммарное количество лайков постов
+    - **dislike_count**: суммарное количество дизлайков постов
+    - **last_post_dt**: дата и время создания последнего поста
+
+    """
+    return await AuthorStatsService.get_author_stats(user_id, db_session)
+
+
+@service_router.get('/metrics', status_code=200, summary='Метрики сервиса.')
+async def get_metrics(
+    events: EventQueue = Depends(get_event_queue),
+    views: ViewRecorder = Depends(get_view_recorder)
+) -> dict:
+    """
+    Возвращает метрики очереди фоновых задач, буфера просмотров,
+    потоков живых счётчиков, объединения загрузок постов и размыкателя
+    цепи Redis (состояние, отказы и доля ответов из запасных источников).
+    Доступен только при METRICS_ENDPOINT_ENABLED.
+    """
+    if not settings.METRICS_ENDPOINT_ENABLED:
+        raise HTTPException(status_code=404, detail='Not Found')
+    return {
+        'events': events.get_metrics(),
+        'views': views.get_metrics(),
+        'live': get_live_counts_metrics(),
+        'post_loads': post_loads.get_metrics(),
+        'redis': redis_breaker.get_metrics()
+    }
+
+
+@service_router.get('/slow-queries', status_code=200, summary='Медленные запросы к базе данных.')
+async def get_slow_queries() -> list[dict]:
+    """
+    Возвращает запросы этого воркера дольше DB_SLOW_QUERY_THRESHOLD миллисекунд,
+    сгруппированные по отпечатку и отсортированные по суммарному времени,
+    с последним снятым планом EXPLAIN (ANALYZE, BUFFERS). Доступен только при
+    DB_SLOW_QUERY_ENDPOINT_ENABLED.
+    """
+    if not settings.DB_SLOW_QUERY_ENDPOINT_ENABLED:
+        raise HTTPException(status_code=404, detail='Not Found')
+    return slow_query_log.get_report()
+
+
+@well_known_router.get('/jwks.json', status_code=200, summary='Открытые ключи подписи токенов.')
+async def get_json_web_key_set() -> ORJSONResponse:
+    """
+    Возвращает набор открытых ключей (JWKS) для локальной проверки
+    access-токенов другими сервисами. Ключ выбирается по заголовку 'kid' токена.
+    """
+    return ORJSONResponse(
+        content=get_jwks(),
+        headers={'Cache-Control': f'public, max-age={settings.JWT_KEYS_RELOAD_INTERVAL}'}
+    )
@@ -28,11 +28,15 @@ class PostBase(BaseModel):
 class PostLikeDislikeMixin(BaseModel):
     like_count: int
     dislike_count: int
+    my_reaction: str | None = None
+    stale: bool = False
 
 
 class PostSingle(PostBase, PostLikeDislikeMixin):
     author: str
     creation_dt: datetime
+    view_count: int = 0
+    unique_view_count: int = 0
 
 
 class PostUpdateResponse(BaseModel):
@@ -56,3 +60,11 @@ class PostDBLikeDislike(PostDB, PostLikeDislikeMixin):
 
 class Posts(BaseModel):
     posts: list[PostDBLikeDislike]
+
+
+class AuthorStatsResponse(BaseModel):
+    author_id: str
+    post_count: int
+    like_count: int
+    dislike_count: int
+    last_post_dt: datetime | None
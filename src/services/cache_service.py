@@ -0,0 +1,161 @@
+import math
+import random
+import time
+from collections import OrderedDict
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from redis.asyncio import client
+
+from config import settings
+from src.compression import IDENTITY, compress, get_supported_encodings
+from src.redis_keys import bucket_id, make_key, post_tag
+from src.schemas import PostSingle
+
+
+META_FIELD = 'meta'
+
+
+class PostCacheService:
+    """
+    Готовые тела ответа поста в hash '<ns>:{p:<post_id>}:cache': по полю на кодировку
+    и служебное поле с временем построения записи и моментом её истечения.
+    Запись перестраивается заранее с вероятностью, растущей к истечению
+    срока (XFetch): чем дольше строится пост, тем раньше начинается
+    обновление, и к моменту истечения запись уже обновлена одним запросом.
+    """
+
+    @staticmethod
+    def get_post_cache_key(post_id: str) -> str:
+        return make_key(post_tag(post_id), 'cache')
+
+    @staticmethod
+    def get_rebuild_lock_key(post_id: str) -> str:
+        return make_key(post_tag(post_id), 'lock')
+
+    @staticmethod
+    def should_refresh_early(meta: bytes | None) -> bool:
+        if not meta:
+            return False
+        delta, expires_at = map(float, meta.split(b':'))
+        jitter = -delta * settings.POST_CACHE_EARLY_REFRESH_BETA * math.log(1.0 - random.random())
+        return time.time() + jitter >= expires_at
+
+    @staticmethod
+    async def get_post_payload(
+        post_id: str, encoding: str, cache: client.Redis
+    ) -> tuple[bytes, str, bool] | None:
+        encoded, plain, meta = await cache.hmget(
+            PostCacheService.get_post_cache_key(post_id), encoding, IDENTITY, META_FIELD
+        )
+        refresh_early = PostCacheService.should_refresh_early(meta)
+        if encoded is not None:
+            return encoded, encoding, refresh_early
+        if plain is not None:
+            return plain, IDENTITY, refresh_early
+        return None
+
+    @staticmethod
+    async def get_post_payloads(post_id: str, cache: client.Redis) -> dict[str, bytes] | None:
+        payloads = await cache.hgetall(PostCacheService.get_post_cache_key(post_id))
+        payloads.pop(META_FIELD.encode(), None)
+        return {encoding.decode(): body for encoding, body in payloads.items()} or None
+
+    @staticmethod
+    def make_post_payloads(post: PostSingle) -> dict[str, bytes]:
+        body = ORJSONResponse(content=jsonable_encoder(post)).body
+        payloads = {IDENTITY: body}
+        if len(body) >= settings.COMPRESSION_MINIMUM_SIZE:
+            for encoding in get_supported_encodings():
+                payloads[encoding] = compress(body, encoding)
+        return payloads
+
+    @staticmethod
+    async def save_post_payload(
+        post_id: str, post: PostSingle, cache: client.Redis, build_time: float = 0.0
+    ) -> dict[str, bytes]:
+        payloads = PostCacheService.make_post_payloads(post)
+        cache_key = PostCacheService.get_post_cache_key(post_id)
+        expires_at = time.time() + settings.POST_CACHE_EXPIRES_IN
+        async with cache.pipeline(transaction=False) as pipe:
+            pipe.delete(cache_key)
+            pipe.hset(cache_key, mapping={**payloads, META_FIELD: f'{build_time}:{expires_at}'})
+            pipe.expire(cache_key, settings.POST_CACHE_EXPIRES_IN)
+            await pipe.execute()
+        return payloads
+
+    @staticmethod
+    async def invalidate_post_payload(post_id: str, cache: client.Redis) -> None:
+        await cache.delete(PostCacheService.get_post_cache_key(post_id))
+
+
+class PostAuthorCacheService:
+    """
+    Кэш 'post_id -> author_id' для проверки реакций без запроса к Postgres.
+    В Redis хранится в hash-бакетах '<ns>:authors:{bucket_id(post_id)}', в процессе —
+    в LRU-словаре с ограниченным сроком жизни записи, чтобы удаление поста
+    в другом воркере становилось видно не позже POST_AUTHOR_LOCAL_TTL секунд.
+    """
+
+    local_cache: OrderedDict[str, tuple[str, float]] = OrderedDict()
+
+    @staticmethod
+    def get_bucket_key(post_id: str) -> str:
+        return make_key('authors', bucket_id(post_id, settings.POST_AUTHOR_BUCKET_KEY_LENGTH))
+
+    @staticmethod
+    def remember_author_id(post_id: str, author_id: str) -> None:
+        local_cache = PostAuthorCacheService.local_cache
+        local_cache[post_id] = (author_id, time.monotonic() + settings.POST_AUTHOR_LOCAL_TTL)
+        local_cache.move_to_end(post_id)
+        while len(local_cache) > settings.POST_AUTHOR_LOCAL_CACHE_SIZE:
+            local_cache.popitem(last=False)
+
+    @staticmethod
+    async def get_author_id(post_id: str, cache: client.Redis) -> str | None:
+        author_id, expires_at = PostAuthorCacheService.local_cache.get(post_id, (None, 0))
+        if author_id and expires_at > time.monotonic():
+            return author_id
+        author_id: bytes = await cache.hget(
+            PostAuthorCacheService.get_bucket_key(post_id), post_id
+        )
+        if author_id is None:
+            PostAuthorCacheService.local_cache.pop(post_id, None)
+            return None
+        PostAuthorCacheService.remember_author_id(post_id, author_id.decode())
+        return author_id.decode()
+
+    @staticmethod
+    async def save_author_id(post_id: str, author_id: str, cache: client.Redis) -> None:
+        PostAuthorCacheService.remember_author_id(post_id, author_id)
+        await cache.hset(PostAuthorCacheService.get_bucket_key(post_id), post_id, author_id)
+
+    @staticmethod
+    async def delete_author_ids(post_ids: list[str], cache: client.Redis) -> None:
+        async with cache.pipeline(transaction=False) as pipe:
+            for post_id in post_ids:
+                PostAuthorCacheService.local_cache.pop(post_id, None)
+                pipe.hdel(PostAuthorCacheService.get_bucket_key(post_id), post_id)
+            await pipe.execute()
+
+
+class PostCountsCacheService:
+    """
+    Последние счётчики реакций и просмотров, прочитанные из Redis, в LRU-словарях
+    процесса. Пока Redis недоступен, ответы строятся из них с пометкой stale.
+    """
+
+    reaction_counts: OrderedDict[str, tuple[int, int]] = OrderedDict()
+    view_counts: OrderedDict[str, tuple[int, int]] = OrderedDict()
+
+    @staticmethod
+    def remember_counts(
+        local_cache: OrderedDict[str, tuple[int, int]],
+        post_ids: list[str],
+        counts: list[tuple[int, int]]
+    ) -> None:
+        for post_id, post_counts in zip(post_ids, counts):
+            local_cache[post_id] = post_counts
+            local_cache.move_to_end(post_id)
+        while len(local_cache) > settings.POST_COUNTS_LOCAL_CACHE_SIZE:
+            local_cache.popitem(last=False)
@@ -0,0 +1,125 @@
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, false, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from src.models import Post
+
+
+# Ключ pg_advisory_xact_lock: секции создаёт только один воркер за раз.
+PARTITION_LOCK_KEY = 7_340_001
+
+EPOCH = datetime(1970, 1, 1)
+MILLISECOND = timedelta(milliseconds=1)
+
+
+class PostPartitionService:
+    """
+    Помесячные секции таблицы post (RANGE по creation_dt). Секции
+    создаются заранее на POST_PARTITIONS_AHEAD месяцев вперёд, потому что
+    вставка в месяц без секции завершается ошибкой.
+    """
+
+    @staticmethod
+    def get_month_start(moment: datetime) -> datetime:
+        return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    @staticmethod
+    def add_months(month_start: datetime, months: int) -> datetime:
+        year, month = divmod(month_start.month - 1 + months, 12)
+        return month_start.replace(year=month_start.year + year, month=month + 1)
+
+    @staticmethod
+    def make_post_id(creation_dt: datetime, random_bits: int | None = None) -> uuid.UUID:
+        """
+        ID поста в формате UUIDv7: в старших 48 битах — creation_dt
+        в миллисекундах от эпохи (локальное время как есть, без перевода в UTC).
+        creation_dt должен быть округлён до миллисекунд.
+        """
+        if random_bits is None:
+            random_bits = int.from_bytes(os.urandom(10), 'big')
+        milliseconds = (creation_dt - EPOCH) // MILLISECOND
+        value = (milliseconds << 80) | (random_bits & ((1 << 80) - 1))
+        value = (value & ~(0xF << 76)) | (0x7 << 76)
+        value = (value & ~(0x3 << 62)) | (0x2 << 62)
+        return uuid.UUID(int=value)
+
+    @staticmethod
+    def new_post_key() -> tuple[uuid.UUID, datetime]:
+        now = datetime.now()
+        creation_dt = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        return PostPartitionService.make_post_id(creation_dt), creation_dt
+
+    @staticmethod
+    def get_creation_dt(post_id: uuid.UUID) -> datetime | None:
+        if post_id.version != 7:
+            return None
+        return EPOCH + (post_id.int >> 80) * MILLISECOND
+
+    @staticmethod
+    def filter_by_id(post_id: str) -> ColumnElement[bool]:
+        """
+        Условие поиска поста по ID. Для ID, созданных make_post_id, добавляется
+        равенство по creation_dt, и Postgres читает одну секцию и индекс
+        первичного ключа. Посты со старыми ID (UUIDv4) ищутся во всех секциях.
+        """
+        try:
+            post_uuid = uuid.UUID(post_id)
+            creation_dt = PostPartitionService.get_creation_dt(post_uuid)
+        except (ValueError, OverflowError):
+            # OverflowError: время в UUIDv7 за пределами datetime (после 9999 года).
+            return false()
+        post_table = Post.__table__
+        if creation_dt is None:
+            return post_table.c.id == post_uuid
+        return and_(post_table.c.id == post_uuid, post_table.c.creation_dt == creation_dt)
+
+    @staticmethod
+    def get_partition_name(month_start: datetime) -> str:
+        return f'{Post.__tablename__}_y{month_start:%Y}m{month_start:%m}'
+
+    @staticmethod
+    async def get_partition_names(db_session: AsyncSession) -> set[str]:
+        query = text("""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            JOIN pg_namespace ON pg_namespace.oid = parent.relnamespace
+            WHERE pg_namespace.nspname = :schema AND parent.relname = :table
+        """)
+        result = await db_session.execute(
+            query, {'schema': Post.__table__.schema, 'table': Post.__tablename__}
+        )
+        return set(result.scalars().all())
+
+    @staticmethod
+    async def create_partitions(
+        db_session: AsyncSession, months_ahead: int, months_back: int = 0
+    ) -> list[str]:
+        schema = Post.__table__.schema
+        await db_session.execute(
+            text('SELECT pg_advisory_xact_lock(:key)'), {'key': PARTITION_LOCK_KEY}
+        )
+        # CREATE TABLE ... PARTITION OF берёт эксклюзивную блокировку post:
+        # лучше отложить создание до следующей проверки, чем копить очередь запросов.
+        await db_session.execute(text("SET LOCAL lock_timeout = '5s'"))
+        existing = await PostPartitionService.get_partition_names(db_session)
+        current_month = PostPartitionService.get_month_start(datetime.now())
+        created = []
+        for offset in range(-months_back, months_ahead + 1):
+            month_start = PostPartitionService.add_months(current_month, offset)
+            name = PostPartitionService.get_partition_name(month_start)
+            if name in existing:
+                continue
+            next_month = PostPartitionService.add_months(month_start, 1)
+            await db_session.execute(text(
+                f'CREATE TABLE {schema}.{name} PARTITION OF {schema}.{Post.__tablename__} '
+                f"FOR VALUES FROM ('{month_start:%Y-%m-%d}') TO ('{next_month:%Y-%m-%d}')"
+            ))
+            created.append(name)
+        await db_session.commit()
+        return created
@@ -1,24 +1,50 @@
+import asyncio
+import contextlib
 import json
+import time
 import uuid
+from datetime import datetime
 from typing import Annotated
 
+import orjson
 from fastapi import HTTPException, Header
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
 from redis import client
+from redis.exceptions import LockError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
-from sqlalchemy.orm import joinedload
+from sqlalchemy import select, tuple_, update, delete
+from sqlalchemy.orm import joinedload, undefer
 
+from config import settings
+from databases import async_read_only_session, redis_breaker
+from src.circuit_breaker import UNAVAILABLE_ERRORS
+from src.compression import IDENTITY, choose_encoding
+from src.events import POST_CREATED, POST_DELETED, POST_REACTED, POST_UPDATED, EventQueue
+from src.live import LiveCountsHub
 from src.schemas import PostBase, PostSingle
 from src.models import Post
+from src.services.cache_service import PostAuthorCacheService, PostCacheService, PostCountsCacheService
+from src.services.partition_service import PostPartitionService
+from src.services.reaction_service import DISLIKE, LIKE, ReactionService
+from src.services.stats_service import AuthorStatsService
 from src.services.token_service import TokenService
+from src.services.view_service import ViewService
+from src.singleflight import SingleFlight
+from src.views import ViewRecorder
+
+
+post_loads = SingleFlight()
 
 
 class PostService:
 
     @staticmethod
     async def create_and_publish_post(
-        post: PostBase, authorization: Annotated[str, Header()], db_session: AsyncSession
+        post: PostBase,
+        authorization: Annotated[str, Header()],
+        db_session: AsyncSession,
+        cache: client.Redis,
+        events: EventQueue
     ) -> JSONResponse:
         access_token = await TokenService.get_token_authorization(authorization)
         validation_result = (
@@ -31,9 +57,20 @@ class PostService:
                 content=post.content,
                 author_id=author_id
             )
+            # creation_dt закодирован в ID, чтобы поиск по ID читал одну секцию.
+            new_post.id, new_post.creation_dt = PostPartitionService.new_post_key()
             db_session.add(new_post)
+            await db_session.flush()
+            await AuthorStatsService.add_post(author_id, new_post.creation_dt, db_session)
             await db_session.commit()
             new_post_id_as_str = str(new_post.id)
+            await PostAuthorCacheService.save_author_id(
+                new_post_id_as_str, str(new_post.author_id), cache
+            )
+            await events.publish(
+                POST_CREATED,
+                {'post_id': new_post_id_as_str, 'author_id': str(new_post.author_id)}
+            )
             creation_dt_as_string = json.dumps(new_post.creation_dt, default=str)
             content = {'id': new_post_id_as_str,
                 'title': new_post.title,
@@ -45,48 +82,290 @@ class PostService:
             } if isinstance(validation_result, tuple) else {}
             return JSONResponse(content=content, headers=headers)
 
+    @staticmethod
+    async def get_post_response(
+        post_id: str,
+        accept_encoding: str | None,
+        authorization: str | None,
+        client_host: str | None,
+        cache: client.Redis,
+        views: ViewRecorder
+    ) -> Response:
+        user_id = await TokenService.get_user_id_if_authorized(authorization, cache)
+        encoding = IDENTITY if user_id else choose_encoding(accept_encoding)
+        cached = payloads = None
+        try:
+            cached = await redis_breaker.call(
+                lambda: PostCacheService.get_post_payload(post_id, encoding, cache)
+            )
+        except UNAVAILABLE_ERRORS:
+            # Без Redis пост строится из Postgres без блокировки перестройки,
+            # а счётчики берутся из запасных источников.
+            redis_breaker.record_fallback('post_cache')
+            payloads = await post_loads.run(
+                post_id, lambda: PostService.build_post_payloads(post_id, cache, save=False)
+            )
+        if payloads is None and (not cached or cached[2]):
+            # При раннем обновлении запрос не ждёт перестройки в другом
+            # воркере, а отдаёт ещё действующую запись.
+            payloads = await post_loads.run(
+                post_id,
+                lambda: PostService.rebuild_post_payloads(post_id, cache, wait=cached is None)
+            )
+            if payloads is None and cached is None:
+                payloads = await PostService.rebuild_post_payloads(post_id, cache, wait=True)
+        if payloads:
+            if encoding not in payloads:
+                encoding = IDENTITY
+            body = payloads[encoding]
+        else:
+            body, encoding, _ = cached
+        views.record(post_id, user_id or client_host or 'anonymous')
+        if user_id:
+            post = orjson.loads(body)
+            [post['my_reaction']], stale = await PostService.get_user_reactions(
+                user_id, [post_id], cache
+            )
+            post['stale'] = post.get('stale', False) or stale
+            return ORJSONResponse(content=post, headers={'Cache-Control': 'private'})
+        headers = {'Vary': 'Accept-Encoding'}
+        if encoding != IDENTITY:
+            headers['Content-Encoding'] = encoding
+        return Response(content=body, media_type='application/json', headers=headers)
+
+    @staticmethod
+    async def rebuild_post_payloads(
+        post_id: str, cache: client.Redis, wait: bool
+    ) -> dict[str, bytes] | None:
+        lock = cache.lock(
+            PostCacheService.get_rebuild_lock_key(post_id),
+            timeout=settings.POST_CACHE_LOCK_TIMEOUT / 1000
+        ) if settings.POST_CACHE_LOCK_ENABLED else None
+        try:
+            acquired = lock is None or await redis_breaker.call(
+                lambda: lock.acquire(blocking=False)
+            )
+        except UNAVAILABLE_ERRORS:
+            # При раннем обновлении отдаётся ещё действующая запись,
+            # иначе пост строится из Postgres без записи в кэш.
+            redis_breaker.record_fallback('post_cache')
+            if not wait:
+                return None
+            return await PostService.build_post_payloads(post_id, cache, save=False)
+        if acquired:
+            try:
+                return await PostService.build_post_payloads(post_id, cache)
+            finally:
+                if lock is not None:
+                    # Неснятая блокировка истечёт через POST_CACHE_LOCK_TIMEOUT.
+                    with contextlib.suppress(LockError, *UNAVAILABLE_ERRORS):
+                        await redis_breaker.call(lock.release)
+        if not wait:
+            return None
+        # Запись строит другой воркер: ждём её, пока он держит блокировку.
+        deadline = time.monotonic() + settings.POST_CACHE_LOCK_TIMEOUT / 1000
+        try:
+            while time.monotonic() < deadline:
+                await asyncio.sleep(settings.POST_CACHE_LOCK_POLL_INTERVAL / 1000)
+                payloads = await redis_breaker.call(
+                    lambda: PostCacheService.get_post_payloads(post_id, cache)
+                )
+                if payloads:
+                    return payloads
+                if not await redis_breaker.call(lock.locked):
+                    break
+        except UNAVAILABLE_ERRORS:
+            redis_breaker.record_fallback('post_cache')
+            return await PostService.build_post_payloads(post_id, cache, save=False)
+        return await PostService.build_post_payloads(post_id, cache)
+
+    @staticmethod
+    async def build_post_payloads(
+        post_id: str, cache: client.Redis, save: bool = True
+    ) -> dict[str, bytes]:
+        started = time.monotonic()
+        # Загрузка идёт в общей задаче SingleFlight и может пережить запрос,
+        # который её начал, поэтому сессия своя, а не из зависимости запроса.
+        async with async_read_only_session() as db_session:
+            post = await PostService.get_post(post_id, db_session, cache)
+        # Пост с устаревшими счётчиками в общий кэш не попадает.
+        if save and not post.stale:
+            try:
+                return await redis_breaker.call(
+                    lambda: PostCacheService.save_post_payload(
+                        post_id, post, cache, build_time=time.monotonic() - started
+                    )
+                )
+            except UNAVAILABLE_ERRORS:
+                redis_breaker.record_fallback('post_cache')
+        return PostCacheService.make_post_payloads(post)
+
+    @staticmethod
+    async def get_reaction_counts(
+        posts: list[Post], cache: client.Redis
+    ) -> tuple[list[tuple[int, int]], bool]:
+        post_ids = [str(post.id) for post in posts]
+        local_cache = PostCountsCacheService.reaction_counts
+        try:
+            counts = await redis_breaker.call(lambda: ReactionService.get_counts(post_ids, cache))
+        except UNAVAILABLE_ERRORS:
+            redis_breaker.record_fallback('reaction_counts')
+            return [
+                local_cache.get(post_id) or (post.likes_count or 0, post.dislikes_count or 0)
+                for post_id, post in zip(post_ids, posts)
+            ], True
+        PostCountsCacheService.remember_counts(local_cache, post_ids, counts)
+        return counts, False
+
+    @staticmethod
+    async def get_view_counts(
+        post_ids: list[str], cache: client.Redis
+    ) -> tuple[list[tuple[int, int]], bool]:
+        local_cache = PostCountsCacheService.view_counts
+        try:
+            counts = await redis_breaker.call(lambda: ViewService.get_counts(post_ids, cache))
+        except UNAVAILABLE_ERRORS:
+            redis_breaker.record_fallback('view_counts')
+            return [local_cache.get(post_id, (0, 0)) for post_id in post_ids], True
+        PostCountsCacheService.remember_counts(local_cache, post_ids, counts)
+        return counts, False
+
+    @staticmethod
+    async def get_user_reactions(
+        user_id: str, post_ids: list[str], cache: client.Redis
+    ) -> tuple[list[str | None], bool]:
+        try:
+            reactions = await redis_breaker.call(
+                lambda: ReactionService.get_user_reactions(user_id, post_ids, cache)
+            )
+        except UNAVAILABLE_ERRORS:
+            redis_breaker.record_fallback('user_reactions')
+            return [None] * len(post_ids), True
+        return reactions, False
+
+    @staticmethod
+    async def get_post_counts_stream(
+        post_id: str, db_session: AsyncSession, cache: client.Redis, live: LiveCountsHub
+    ) -> StreamingResponse:
+        query = select(Post).filter(PostPartitionService.filter_by_id(post_id), Post.deleted_at.is_(None))
+        result = await db_session.execute(query)
+        post = result.scalar_one_or_none()
+        if not post:
+            raise HTTPException(status_code=404, detail='Запись не найдена.')
+        # Поток может длиться часами: соединение с Postgres нужно вернуть
+        # в пул сразу после проверки, что пост существует. Счётчики из
+        # колонок поста нужны для снимка, пока Redis недоступен.
+        await db_session.close()
+
+        async def stream():
+            # Сначала подписка, затем снимок: изменение, случившееся между
+            # чтением счётчиков и подпиской, иначе не дошло бы до клиента.
+            async with live.listen(post_id) as updates:
+                [(like_count, dislike_count)], stale = await PostService.get_reaction_counts(
+                    [post], cache
+                )
+                counts = orjson.dumps(
+                    {'like_count': like_count, 'dislike_count': dislike_count, 'stale': stale}
+                )
+                yield b'event: counts\ndata: ' + counts + b'\n\n'
+                while True:
+                    try:
+                        counts = await asyncio.wait_for(
+                            updates.get(), settings.LIVE_HEARTBEAT_INTERVAL
+                        )
+                    except asyncio.TimeoutError:
+                        yield b': ping\n\n'
+                        continue
+                    yield b'event: counts\ndata: ' + counts + b'\n\n'
+
+        return StreamingResponse(
+            stream(),
+            media_type='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
     @staticmethod
     async def get_post(post_id: str, db_session: AsyncSession, cache: client.Redis) -> PostSingle:
-        query = select(Post).filter(Post.id == post_id)
-        query = query.options(joinedload(Post.author))
+        query = select(Post).filter(PostPartitionService.filter_by_id(post_id), Post.deleted_at.is_(None))
+        query = query.options(joinedload(Post.author), undefer(Post.content))
         result = await db_session.execute(query)
         post = result.scalar()
         if not post:
             raise HTTPException(status_code=404, detail='Запись не найдена.')
         author_name = post.author.login
-        like_count = await PostService.get_post_like_count(post_id, cache)
-        dislike_count = await PostService.get_post_dislike_count(post_id, cache)
+        (
+            ([(like_count, dislike_count)], reactions_stale),
+            ([(view_count, unique_view_count)], views_stale)
+        ) = await asyncio.gather(
+            PostService.get_reaction_counts([post], cache),
+            PostService.get_view_counts([post_id], cache)
+        )
         return PostSingle(
             title=post.title,
             content=post.content,
             author=author_name,
             creation_dt=post.creation_dt,
             like_count=like_count,
-            dislike_count=dislike_count
+            dislike_count=dislike_count,
+            view_count=view_count,
+            unique_view_count=unique_view_count,
+            stale=reactions_stale or views_stale
         )
 
     @staticmethod
     async def get_posts(
-        db_session: AsyncSession, cache: client.Redis
+        authorization: str | None,
+        before: datetime | None,
+        before_id: uuid.UUID | None,
+        limit: int,
+        db_session: AsyncSession,
+        cache: client.Redis
     ) -> list[dict | None]:
-        query = select(Post)
+        # Постраничный вывод от новых постов к старым по (creation_dt, id):
+        # id различает посты с одинаковым creation_dt на границе страниц.
+        # Условие на ключ секционирования и LIMIT позволяют Postgres
+        # читать только нужные помесячные секции.
+        query = (select(Post.id, Post.title, Post.author_id, Post.creation_dt,
+                        Post.likes_count, Post.dislikes_count).
+                 filter(Post.deleted_at.is_(None)).
+                 order_by(Post.creation_dt.desc(), Post.id.desc()).
+                 limit(limit))
+        if before is not None and before_id is not None:
+            query = query.filter(
+                Post.creation_dt <= before,
+                tuple_(Post.creation_dt, Post.id) < tuple_(before, before_id)
+            )
+        elif before is not None:
+            query = query.filter(Post.creation_dt < before)
         result = await db_session.execute(query)
-        posts = result.scalars().all()
+        posts = result.all()
+        post_ids = [str(post.id) for post in posts]
+        counts, counts_stale = await PostService.get_reaction_counts(posts, cache)
+        user_id = await TokenService.get_user_id_if_authorized(authorization, cache)
+        reactions, reactions_stale = (
+            await PostService.get_user_reactions(user_id, post_ids, cache)
+            if user_id else ([None] * len(post_ids), False)
+        )
         return [{
-            'id': str(post.id),
+            'id': post_id,
             'title': post.title,
             'author_id': str(post.author_id),
             'creation_dt': post.creation_dt,
-            'like_count': await PostService.get_post_like_count(str(post.id), cache),
-            'dislike_count': await PostService.get_post_dislike_count(str(post.id), cache)
-        } for post in posts] if posts else []
+            'like_count': like_count,
+            'dislike_count': dislike_count,
+            'my_reaction': my_reaction,
+            'stale': counts_stale or reactions_stale
+        } for post_id, post, (like_count, dislike_count), my_reaction
+            in zip(post_ids, posts, counts, reactions)] if posts else []
     
     @staticmethod
     async def update_post(
         post_id: str,
         post_to_update: PostBase,
         authorization: Annotated[str, Header()],
-        db_session: AsyncSession
+        db_session: AsyncSession,
+        cache: client.Redis,
+        events: EventQueue
     ) -> JSONResponse:
         access_token = await TokenService.get_token_authorization(authorization)
         validation_result = (
@@ -94,9 +373,13 @@ class PostService:
         )
         if validation_result:
             user_id = await TokenService.get_user_id_by_token(access_token)
-            query = select(Post).filter(Post.id == post_id, Post.author_id == user_id)
+            query = select(Post).filter(
+                PostPartitionService.filter_by_id(post_id),
+                Post.author_id == user_id,
+                Post.deleted_at.is_(None)
+            )
             result = await db_session.execute(query)
-            post = result.one_or_none()
+            post = result.scalar_one_or_none()
             if not post:
                 raise HTTPException(
                     status_code=404,
@@ -104,7 +387,7 @@ class PostService:
                 )
             post_table = Post.__table__
             upd_query = (update(post_table).
-                where(post_table.c.id == uuid.UUID(post_id)).
+                where(post_table.c.id == post.id, post_table.c.creation_dt == post.creation_dt).
                 values({
                     post_table.c.title: post_to_update.title,
                     post_table.c.content: post_to_update.content
@@ -112,6 +395,8 @@ class PostService:
             )
             await db_session.execute(upd_query)
             await db_session.commit()
+            await PostCacheService.invalidate_post_payload(post_id, cache)
+            await events.publish(POST_UPDATED, {'post_id': post_id})
             content = {'title': post_to_update.title}
             headers = {
                 'X-Access-Token': validation_result[0],
@@ -123,7 +408,9 @@ class PostService:
     async def delete_post(
         post_id: str,
         authorization: Annotated[str, Header()],
-        db_session: AsyncSession
+        db_session: AsyncSession,
+        cache: client.Redis,
+        events: EventQueue
     ) -> JSONResponse:
         access_token = await TokenService.get_token_authorization(authorization)
         validation_result = (
@@ -131,19 +418,38 @@ class PostService:
         )
         if validation_result:
             user_id = await TokenService.get_user_id_by_token(access_token)
-            query = select(Post).filter(Post.id == post_id, Post.author_id == user_id)
+            query = select(Post).filter(
+                PostPartitionService.filter_by_id(post_id),
+                Post.author_id == user_id,
+                Post.deleted_at.is_(None)
+            )
             result = await db_session.execute(query)
-            post = result.one_or_none()
+            post = result.scalar_one_or_none()
             if not post:
                 raise HTTPException(
                     status_code=404,
                     detail="Запись не найдена либо удалить запись может только автор."
                 )
             post_table = Post.__table__
-            delete_query = (delete(post_table).
-                            where(post_table.c.id == uuid.UUID(post_id)))
-            await db_session.execute(delete_query)
+            delete_query = (update(post_table).
+                            where(post_table.c.id == post.id,
+                                  post_table.c.creation_dt == post.creation_dt,
+                                  post_table.c.deleted_at.is_(None)).
+                            values({post_table.c.deleted_at: datetime.now()}).
+                            returning(post_table.c.likes_count, post_table.c.dislikes_count))
+            result = await db_session.execute(delete_query)
+            deleted = result.one_or_none()
+            if deleted:
+                await AuthorStatsService.remove_post(
+                    user_id, post.creation_dt, deleted.likes_count, deleted.dislikes_count,
+                    db_session
+                )
             await db_session.commit()
+            await PostCacheService.invalidate_post_payload(post_id, cache)
+            await PostAuthorCacheService.delete_author_ids([post_id], cache)
+            await events.publish(
+                POST_DELETED, {'post_id': post_id, 'author_id': str(user_id)}
+            )
             content = {'id': post_id}
             headers = {
                 'X-Access-Token': validation_result[0],
@@ -156,16 +462,17 @@ class PostService:
         post_id: str,
         authorization: Annotated[str, Header()],
         db_session: AsyncSession,
-        cache: client.Redis
+        cache: client.Redis,
+        events: EventQueue
     ) -> str:
-        user_id = await PostService.check_user_allowed_like_or_dislike(post_id, authorization, db_session)
+        user_id = await PostService.check_user_allowed_like_or_dislike(
+            post_id, authorization, db_session, cache
+        )
         if user_id:
-            if await PostService.check_user_likes_or_dislikes_first_time(user_id, post_id, cache, 'like'):
-                like_count = await PostService.get_post_like_count(post_id, cache)
-                like_count += 1
-                await cache.set(f'like:{post_id}', like_count)
-                await cache.rpush(f'like:{user_id}', post_id)
-                await cache.lrem(f'dislike:{user_id}', 0, post_id)
+            if await PostService.check_user_likes_or_dislikes_first_time(user_id, post_id, cache, LIKE):
+                await ReactionService.add_reaction(post_id, user_id, LIKE, cache)
+                await PostCacheService.invalidate_post_payload(post_id, cache)
+                await events.publish(POST_REACTED, {'post_id': post_id, 'flag': LIKE})
                 return 'Лайк добавлен.'
             
     @staticmethod
@@ -173,41 +480,71 @@ class PostService:
         post_id: str,
         authorization: Annotated[str, Header()],
         db_session: AsyncSession,
-        cache: client.Redis
+        cache: client.Redis,
+        events: EventQueue
     ) -> str:
-        user_id = await PostService.check_user_allowed_like_or_dislike(post_id, authorization, db_session)
+        user_id = await PostService.check_user_allowed_like_or_dislike(
+            post_id, authorization, db_session, cache
+        )
         if user_id:
-            if await PostService.check_user_likes_or_dislikes_first_time(user_id, post_id, cache, 'dislike'):
-                dislike_count = await PostService.get_post_dislike_count(post_id, cache)
-                dislike_count += 1
-                await cache.set(f'dislike:{post_id}', dislike_count)
-                await cache.rpush(f'dislike:{user_id}', post_id)
-                await cache.lrem(f'like:{user_id}', 0, post_id)
+            if await PostService.check_user_likes_or_dislikes_first_time(user_id, post_id, cache, DISLIKE):
+                await ReactionService.add_reaction(post_id, user_id, DISLIKE, cache)
+                await PostCacheService.invalidate_post_payload(post_id, cache)
+                await events.publish(POST_REACTED, {'post_id': post_id, 'flag': DISLIKE})
                 return 'Дизлайк добавлен.'
         
     @staticmethod
-    async def get_post_like_count(post_id: str, cache: client.Redis) -> int:
-        like_key = f'like:{post_id}'
-        like_count: bytes = await cache.get(like_key)
-        if not like_count:
-            await cache.set(like_key, 0)
+    async def purge_deleted_posts(
+        db_session: AsyncSession, cache: client.Redis, batch_size: int
+    ) -> int:
+        query = (select(Post.id, Post.creation_dt).
+                 filter(Post.deleted_at.is_not(None)).
+                 limit(batch_size).
+                 with_for_update(skip_locked=True))
+        result = await db_session.execute(query)
+        post_keys = result.all()
+        post_ids = [str(post.id) for post in post_keys]
+        if not post_ids:
+            await db_session.rollback()
             return 0
-        return int(like_count.decode())
-    
+        await ReactionService.purge_posts(post_ids, cache)
+        await PostAuthorCacheService.delete_author_ids(post_ids, cache)
+        # Ключи одного поста лежат в одном слоте кластера, поэтому DEL — на пост.
+        async with cache.pipeline(transaction=False) as pipe:
+            for post_id in post_ids:
+                pipe.delete(PostCacheService.get_post_cache_key(post_id), *ViewService.get_keys(post_id))
+            await pipe.execute()
+        post_table = Post.__table__
+        delete_query = (delete(post_table).
+                        where(tuple_(post_table.c.id, post_table.c.creation_dt).
+                              in_([tuple(post) for post in post_keys])))
+        await db_session.execute(delete_query)
+        await db_session.commit()
+        return len(post_ids)
+
     @staticmethod
-    async def get_post_dislike_count(post_id: str, cache: client.Redis) -> int:
-        dislike_key = f'dislike:{post_id}'
-        dislike_count: bytes = await cache.get(dislike_key)
-        if not dislike_count:
-            await cache.set(dislike_key, 0)
-            return 0
-        return int(dislike_count.decode())
-    
+    async def get_post_author_id(
+        post_id: str, db_session: AsyncSession, cache: client.Redis
+    ) -> str:
+        author_id = await PostAuthorCacheService.get_author_id(post_id, cache)
+        if author_id:
+            return author_id
+        query = select(Post.author_id).filter(
+            PostPartitionService.filter_by_id(post_id), Post.deleted_at.is_(None)
+        )
+        result = await db_session.execute(query)
+        author_id = result.scalar_one_or_none()
+        if not author_id:
+            raise HTTPException(status_code=404, detail='Запись не найдена.')
+        await PostAuthorCacheService.save_author_id(post_id, str(author_id), cache)
+        return str(author_id)
+
     @staticmethod
     async def check_user_allowed_like_or_dislike(
         post_id: str,
         authorization: Annotated[str, Header()],
-        db_session: AsyncSession
+        db_session: AsyncSession,
+        cache: client.Redis
     ) -> str:
         access_token = await TokenService.get_token_authorization(authorization)
         validation_result = (
@@ -215,10 +552,7 @@ class PostService:
         )
         if validation_result:
             user_id = await TokenService.get_user_id_by_token(access_token)
-            query = select(Post).filter(Post.id == post_id, Post.author_id == user_id)
-            result = await db_session.execute(query)
-            post = result.one_or_none()
-            if post:
+            if await PostService.get_post_author_id(post_id, db_session, cache) == user_id:
                 raise HTTPException(
                     status_code=403, detail="Действие запрещено."
                 )
@@ -228,10 +562,7 @@ class PostService:
     async def check_user_likes_or_dislikes_first_time(
         user_id: str, post_id: str, cache: client.Redis, flag: str
     ) -> bool:
-        if not await cache.exists(f'{flag}:{user_id}'):
-            return True
-        posts_user_liked = await cache.lrange(f'{flag}:{user_id}', 0, -1)
-        if post_id.encode() in posts_user_liked:
+        if await ReactionService.has_reacted(user_id, post_id, flag, cache):
             raise HTTPException(
                 status_code=403, detail="Действие запрещено."
             )
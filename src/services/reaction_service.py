@@ -0,0 +1,236 @@
+from redis.asyncio import client
+
+from config import settings
+from src.redis_keys import bucket_id, make_key, post_tag, user_tag
+
+
+LIKE = 'like'
+DISLIKE = 'dislike'
+OPPOSITE_FLAG = {LIKE: DISLIKE, DISLIKE: LIKE}
+
+LEGACY = 'legacy'
+DUAL = 'dual'
+COMPACT = 'compact'
+
+# Увеличивает счётчик в hash-бакете. Если поле ещё не перенесено,
+# оно инициализируется значением из старого строкового ключа.
+# В режиме dual новое значение дублируется в старый ключ.
+INCREMENT_COUNTER_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 0 then
+    redis.call('HSET', KEYS[1], ARGV[1], tonumber(redis.call('GET', KEYS[2]) or '0'))
+end
+local count = redis.call('HINCRBY', KEYS[1], ARGV[1], 1)
+if ARGV[2] == '1' then
+    redis.call('SET', KEYS[2], count)
+end
+return count
+"""
+
+
+class ReactionService:
+    """
+    Хранение лайков и дизлайков в Redis.
+
+    Старая схема (legacy): счётчик поста — строка '{flag}:{post_id}',
+    реакции пользователя — список '{flag}:{user_id}'.
+    Компактная схема (compact): счётчики в hash-бакетах '<ns>:reactions:{bucket_id(post_id)}',
+    реакции пользователя — множество '<ns>:{u:<user_id>}:reactions:{flag}',
+    отреагировавшие на пост — множество '<ns>:{p:<post_id>}:reactors:{flag}'.
+    В режиме dual запись идёт в обе схемы, а чтение — сначала из компактной.
+    """
+
+    @staticmethod
+    def get_legacy_counter_key(flag: str, post_id: str) -> str:
+        return f'{flag}:{post_id}'
+
+    @staticmethod
+    def get_legacy_user_key(flag: str, user_id: str) -> str:
+        return f'{flag}:{user_id}'
+
+    @staticmethod
+    def get_legacy_reactors_key(flag: str, post_id: str) -> str:
+        return f'{flag}:{post_id}:users'
+
+    @staticmethod
+    def get_bucket_key(post_id: str) -> str:
+        return make_key('reactions', bucket_id(post_id, settings.REACTIONS_BUCKET_KEY_LENGTH))
+
+    @staticmethod
+    def get_bucket_field(flag: str, post_id: str) -> str:
+        return f'{flag[0]}:{post_id}'
+
+    @staticmethod
+    def get_user_key(flag: str, user_id: str) -> str:
+        return make_key(user_tag(user_id), 'reactions', flag)
+
+    @staticmethod
+    def get_reactors_key(flag: str, post_id: str) -> str:
+        return make_key(post_tag(post_id), 'reactors', flag)
+
+    @staticmethod
+    def reads_compact() -> bool:
+        return settings.REACTIONS_LAYOUT in (DUAL, COMPACT)
+
+    @staticmethod
+    def reads_legacy() -> bool:
+        return settings.REACTIONS_LAYOUT in (LEGACY, DUAL)
+
+    @staticmethod
+    async def get_counts(
+        post_ids: list[str], cache: client.Redis
+    ) -> list[tuple[int, int]]:
+        reads_compact = ReactionService.reads_compact()
+        reads_legacy = ReactionService.reads_legacy()
+        async with cache.pipeline(transaction=False) as pipe:
+            for post_id in post_ids:
+                if reads_compact:
+                    pipe.hmget(
+                        ReactionService.get_bucket_key(post_id),
+                        ReactionService.get_bucket_field(LIKE, post_id),
+                        ReactionService.get_bucket_field(DISLIKE, post_id)
+                    )
+                if reads_legacy:
+                    pipe.mget(
+                        ReactionService.get_legacy_counter_key(LIKE, post_id),
+                        ReactionService.get_legacy_counter_key(DISLIKE, post_id)
+                    )
+            responses = iter(await pipe.execute())
+        counts = []
+        for _ in post_ids:
+            values = [None, None]
+            if reads_compact:
+                values = next(responses)
+            if reads_legacy:
+                legacy_values = next(responses)
+                values = [
+                    value if value is not None else legacy_value
+                    for value, legacy_value in zip(values, legacy_values)
+                ]
+            like_count, dislike_count = (int(value or 0) for value in values)
+            counts.append((like_count, dislike_count))
+        return counts
+
+    @staticmethod
+    async def has_reacted(
+        user_id: str, post_id: str, flag: str, cache: client.Redis
+    ) -> bool:
+        reads_compact = ReactionService.reads_compact()
+        reads_legacy = ReactionService.reads_legacy()
+        async with cache.pipeline(transaction=False) as pipe:
+            if reads_compact:
+                pipe.sismember(ReactionService.get_user_key(flag, user_id), post_id)
+            if reads_legacy:
+                pipe.lpos(ReactionService.get_legacy_user_key(flag, user_id), post_id)
+            responses = iter(await pipe.execute())
+        if reads_compact and next(responses):
+            return True
+        return reads_legacy and next(responses) is not None
+
+    @staticmethod
+    async def get_user_reactions(
+        user_id: str, post_ids: list[str], cache: client.Redis
+    ) -> list[str | None]:
+        if not post_ids:
+            return []
+        reads_compact = ReactionService.reads_compact()
+        reads_legacy = ReactionService.reads_legacy()
+        async with cache.pipeline(transaction=False) as pipe:
+            for flag in (LIKE, DISLIKE):
+                if reads_compact:
+                    pipe.smismember(ReactionService.get_user_key(flag, user_id), post_ids)
+                if reads_legacy:
+                    pipe.lrange(ReactionService.get_legacy_user_key(flag, user_id), 0, -1)
+            responses = iter(await pipe.execute())
+        membership = {}
+        for flag in (LIKE, DISLIKE):
+            flags = [False] * len(post_ids)
+            if reads_compact:
+                flags = [bool(is_member) for is_member in next(responses)]
+            if reads_legacy:
+                legacy_post_ids = set(next(responses))
+                flags = [
+                    is_member or post_id.encode() in legacy_post_ids
+                    for is_member, post_id in zip(flags, post_ids)
+                ]
+            membership[flag] = flags
+        return [
+            LIKE if liked else DISLIKE if disliked else None
+            for liked, disliked in zip(membership[LIKE], membership[DISLIKE])
+        ]
+
+    @staticmethod
+    async def add_reaction(
+        post_id: str, user_id: str, flag: str, cache: client.Redis
+    ) -> None:
+        opposite_flag = OPPOSITE_FLAG[flag]
+        layout = settings.REACTIONS_LAYOUT
+        # Ключи бакета, пользователя и поста лежат в разных слотах кластера,
+        # поэтому там команды идут конвейером без MULTI, сгруппированным по узлам.
+        async with cache.pipeline(transaction=not settings.REDIS_CLUSTER) as pipe:
+            if layout == LEGACY:
+                pipe.incr(ReactionService.get_legacy_counter_key(flag, post_id))
+            elif layout == DUAL:
+                pipe.eval(
+                    INCREMENT_COUNTER_SCRIPT,
+                    2,
+                    ReactionService.get_bucket_key(post_id),
+                    ReactionService.get_legacy_counter_key(flag, post_id),
+                    ReactionService.get_bucket_field(flag, post_id),
+                    '1'
+                )
+            else:
+                pipe.hincrby(
+                    ReactionService.get_bucket_key(post_id),
+                    ReactionService.get_bucket_field(flag, post_id),
+                    1
+                )
+            if layout in (LEGACY, DUAL):
+                pipe.rpush(ReactionService.get_legacy_user_key(flag, user_id), post_id)
+                pipe.lrem(ReactionService.get_legacy_user_key(opposite_flag, user_id), 0, post_id)
+                pipe.sadd(ReactionService.get_legacy_reactors_key(flag, post_id), user_id)
+                pipe.srem(ReactionService.get_legacy_reactors_key(opposite_flag, post_id), user_id)
+            if layout in (DUAL, COMPACT):
+                pipe.sadd(ReactionService.get_user_key(flag, user_id), post_id)
+                pipe.srem(ReactionService.get_user_key(opposite_flag, user_id), post_id)
+                pipe.sadd(ReactionService.get_reactors_key(flag, post_id), user_id)
+                pipe.srem(ReactionService.get_reactors_key(opposite_flag, post_id), user_id)
+            await pipe.execute()
+
+    @staticmethod
+    async def purge_posts(post_ids: list[str], cache: client.Redis) -> None:
+        reads_compact = ReactionService.reads_compact()
+        reads_legacy = ReactionService.reads_legacy()
+        async with cache.pipeline(transaction=False) as pipe:
+            for post_id in post_ids:
+                for flag in (LIKE, DISLIKE):
+                    if reads_compact:
+                        pipe.smembers(ReactionService.get_reactors_key(flag, post_id))
+                    if reads_legacy:
+                        pipe.smembers(ReactionService.get_legacy_reactors_key(flag, post_id))
+            responses = iter(await pipe.execute())
+        async with cache.pipeline(transaction=False) as pipe:
+            for post_id in post_ids:
+                for flag in (LIKE, DISLIKE):
+                    reactors = set()
+                    if reads_compact:
+                        reactors |= next(responses)
+                    if reads_legacy:
+                        reactors |= next(responses)
+                    for user_id in reactors:
+                        user_id = user_id.decode()
+                        if reads_compact:
+                            pipe.srem(ReactionService.get_user_key(flag, user_id), post_id)
+                        if reads_legacy:
+                            pipe.lrem(ReactionService.get_legacy_user_key(flag, user_id), 0, post_id)
+                    # По одному ключу на DEL: в кластере ключи поста и старой
+                    # схемы лежат в разных слотах.
+                    if reads_compact:
+                        pipe.delete(ReactionService.get_reactors_key(flag, post_id))
+                        pipe.hdel(
+                            ReactionService.get_bucket_key(post_id),
+                            ReactionService.get_bucket_field(flag, post_id)
+                        )
+                    if reads_legacy:
+                        pipe.delete(ReactionService.get_legacy_counter_key(flag, post_id))
+                        pipe.delete(ReactionService.get_legacy_reactors_key(flag, post_id))
+            await pipe.execute()
@@ -0,0 +1,141 @@
+import uuid
+from datetime import datetime
+
+from fastapi import HTTPException
+from redis.asyncio import client
+from sqlalchemy import case, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import AuthorStats, Post, User
+from src.schemas import AuthorStatsResponse
+from src.services.partition_service import PostPartitionService
+from src.services.reaction_service import ReactionService
+
+
+class AuthorStatsService:
+    """
+    Сводная статистика авторов в таблице author_stats. Строка автора
+    обновляется в той же транзакции, что создаёт или удаляет пост,
+    а счётчики реакций переносятся из Redis в колонки likes_count/dislikes_count
+    поста и автора обработчиком события POST_REACTED.
+    """
+
+    @staticmethod
+    async def get_author_stats(author_id: uuid.UUID, db_session: AsyncSession) -> AuthorStatsResponse:
+        query = (select(User.id, AuthorStats).
+                 outerjoin(AuthorStats, AuthorStats.author_id == User.id).
+                 filter(User.id == author_id))
+        result = await db_session.execute(query)
+        row = result.one_or_none()
+        if not row:
+            raise HTTPException(status_code=404, detail='Пользователь не найден.')
+        stats = row.AuthorStats
+        return AuthorStatsResponse(
+            author_id=str(row.id),
+            post_count=stats.post_count if stats else 0,
+            like_count=stats.likes_count if stats else 0,
+            dislike_count=stats.dislikes_count if stats else 0,
+            last_post_dt=stats.last_post_dt if stats else None
+        )
+
+    @staticmethod
+    async def add_post(author_id: str, creation_dt: datetime, db_session: AsyncSession) -> None:
+        stats_table = AuthorStats.__table__
+        query = insert(stats_table).values(
+            author_id=author_id, post_count=1, last_post_dt=creation_dt
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[stats_table.c.author_id],
+            set_={
+                'post_count': stats_table.c.post_count + 1,
+                'last_post_dt': func.greatest(stats_table.c.last_post_dt, query.excluded.last_post_dt)
+            }
+        )
+        await db_session.execute(query)
+
+    @staticmethod
+    async def remove_post(
+        author_id: str,
+        creation_dt: datetime,
+        likes_count: int | None,
+        dislikes_count: int | None,
+        db_session: AsyncSession
+    ) -> None:
+        post_table = Post.__table__
+        stats_table = AuthorStats.__table__
+        # Дата последнего поста пересчитывается, только если удалён он сам;
+        # поиск идёт по индексу ix_post_author_id_creation_dt_alive.
+        last_post_dt = case(
+            (stats_table.c.last_post_dt == creation_dt,
+             select(func.max(post_table.c.creation_dt)).
+             where(post_table.c.author_id == author_id,
+                   post_table.c.deleted_at.is_(None)).
+             scalar_subquery()),
+            else_=stats_table.c.last_post_dt
+        )
+        query = (update(stats_table).
+                 where(stats_table.c.author_id == author_id).
+                 values({
+                     stats_table.c.post_count: stats_table.c.post_count - 1,
+                     stats_table.c.likes_count: stats_table.c.likes_count - (likes_count or 0),
+                     stats_table.c.dislikes_count: stats_table.c.dislikes_count - (dislikes_count or 0),
+                     stats_table.c.last_post_dt: last_post_dt
+                 }))
+        await db_session.execute(query)
+
+    @staticmethod
+    async def sync_reactions(post_id: str, db_session: AsyncSession, cache: client.Redis) -> None:
+        """
+        Записывает в пост абсолютные счётчики из Redis, а в author_stats —
+        разницу с прежними значениями поста. Повторная обработка события
+        ничего не меняет, пропущенное событие восполняется следующим.
+        Счётчики читаются после блокировки строки поста, поэтому из двух
+        одновременных обработчиков последним пишет прочитавший их позже.
+        """
+        post_table = Post.__table__
+        stats_table = AuthorStats.__table__
+        query = (select(post_table.c.id, post_table.c.creation_dt, post_table.c.author_id,
+                        post_table.c.likes_count, post_table.c.dislikes_count).
+                 where(PostPartitionService.filter_by_id(post_id), post_table.c.deleted_at.is_(None)).
+                 with_for_update())
+        post = (await db_session.execute(query)).one_or_none()
+        if post is None:
+            await db_session.rollback()
+            return
+        [(like_count, dislike_count)] = await ReactionService.get_counts([post_id], cache)
+        like_delta = like_count - (post.likes_count or 0)
+        dislike_delta = dislike_count - (post.dislikes_count or 0)
+        if like_delta or dislike_delta:
+            await db_session.execute(
+                update(post_table).
+                where(post_table.c.id == post.id, post_table.c.creation_dt == post.creation_dt).
+                values(likes_count=like_count, dislikes_count=dislike_count)
+            )
+            await db_session.execute(
+                update(stats_table).
+                where(stats_table.c.author_id == post.author_id).
+                values({
+                    stats_table.c.likes_count: stats_table.c.likes_count + like_delta,
+                    stats_table.c.dislikes_count: stats_table.c.dislikes_count + dislike_delta
+                })
+            )
+        await db_session.commit()
+
+    @staticmethod
+    async def rebuild(db_session: AsyncSession) -> None:
+        post_table = Post.__table__
+        stats_table = AuthorStats.__table__
+        aggregate = (select(
+            post_table.c.author_id,
+            func.count(),
+            func.coalesce(func.sum(post_table.c.likes_count), 0),
+            func.coalesce(func.sum(post_table.c.dislikes_count), 0),
+            func.max(post_table.c.creation_dt)
+        ).where(post_table.c.deleted_at.is_(None)).group_by(post_table.c.author_id))
+        await db_session.execute(stats_table.delete())
+        await db_session.execute(insert(stats_table).from_select(
+            ['author_id', 'post_count', 'likes_count', 'dislikes_count', 'last_post_dt'],
+            aggregate
+        ))
+        await db_session.commit()
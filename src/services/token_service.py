@@ -1,24 +1,81 @@
+import hashlib
+import uuid
 from datetime import datetime, timedelta
 from typing import Annotated
 
 from fastapi import HTTPException, Header
-from jose import ExpiredSignatureError, jwt
-from jose.exceptions import JWTError
+import jwt
+from jwt import ExpiredSignatureError, PyJWTError
 from redis.asyncio import client
 
 from config import settings
+from databases import get_redis, redis_breaker
+from src.circuit_breaker import UNAVAILABLE_ERRORS
+from src.jwt_keys import decode_access_token, encode_access_token
+from src.redis_keys import make_key, user_tag
+
+
+# Сохраняет сессию в hash '<ns>:{u:<user_id>}:sessions' (поле — ID сессии,
+# значение — '<истекает в>:<refresh-токен>') и удаляет истёкшие сессии.
+SAVE_SESSION_SCRIPT = """
+local now = tonumber(ARGV[3])
+local sessions = redis.call('HGETALL', KEYS[1])
+for i = 1, #sessions, 2 do
+    local value = sessions[i + 1]
+    local expires_at = tonumber(string.sub(value, 1, string.find(value, ':', 1, true) - 1))
+    if expires_at < now then
+        redis.call('HDEL', KEYS[1], sessions[i])
+    end
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+if redis.call('TTL', KEYS[1]) < tonumber(ARGV[4]) then
+    redis.call('EXPIRE', KEYS[1], ARGV[4])
+end
+return 1
+"""
+
+# Ротация refresh-токена сессии. Возвращает 1 при успехе, 0 — если сессия
+# не найдена или истекла. Если сохранён другой токен: при проверке повторного
+# использования (ARGV[7] = '1', токен предъявлен клиентом) сессия отзывается
+# целиком и возвращается -1, иначе сессия не меняется и возвращается 2 —
+# токен уже обновил параллельный запрос. Прежний access-токен отзывается
+# ключом KEYS[2] в том же слоте кластера, что и сессии пользователя.
+ROTATE_SESSION_SCRIPT = """
+local stored = redis.call('HGET', KEYS[1], ARGV[1])
+if not stored then
+    return 0
+end
+local separator = string.find(stored, ':', 1, true)
+if tonumber(string.sub(stored, 1, separator - 1)) < tonumber(ARGV[4]) then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+    return 0
+end
+if string.sub(stored, separator + 1) ~= ARGV[2] then
+    if ARGV[7] ~= '1' then
+        return 2
+    end
+    redis.call('HDEL', KEYS[1], ARGV[1])
+    return -1
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[3])
+if redis.call('TTL', KEYS[1]) < tonumber(ARGV[5]) then
+    redis.call('EXPIRE', KEYS[1], ARGV[5])
+end
+redis.call('SETEX', KEYS[2], ARGV[6], 1)
+return 1
+"""
 
 
 class TokenService:
 
     @staticmethod
-    async def generate_tokens(user_id: str) -> tuple[str]:
-        subject_id = {'sub': user_id}
+    async def generate_tokens(user_id: str, session_id: str) -> tuple[str]:
+        subject_id = {'sub': user_id, 'sid': session_id}
         access_token = await TokenService.generate_access_token(
             subject_id, settings.ACCESS_TOKEN_EXPIRES_IN
         )
         refresh_token = await TokenService.generate_refresh_token(
-            subject_id, settings.REFRESH_TOKEN_EXPIRES_IN
+            {**subject_id, 'jti': uuid.uuid4().hex}, settings.REFRESH_TOKEN_EXPIRES_IN
         )
         return access_token, refresh_token
     
@@ -27,10 +84,7 @@ class TokenService:
         to_encode = await TokenService.prepare_data_for_generating_tokens(
             data, expires_delta
         )
-        encoded_jwt = jwt.encode(
-            to_encode, settings.ACCESS_JWT_SECRET_KEY,
-            algorithm=settings.JWT_ALGORITHM
-        )
+        encoded_jwt = encode_access_token(to_encode)
         return encoded_jwt
 
     @staticmethod
@@ -40,7 +94,7 @@ class TokenService:
         )
         encoded_jwt = jwt.encode(
             to_encode, settings.REFRESH_JWT_SECRET_KEY,
-            algorithm=settings.JWT_ALGORITHM
+            algorithm=settings.JWT_REFRESH_ALGORITHM
         )
         return encoded_jwt
     
@@ -53,63 +107,115 @@ class TokenService:
         to_encode.update({'exp': expire_in_days})
         return to_encode
     
+    @staticmethod
+    def get_sessions_key(user_id: str) -> str:
+        return make_key(user_tag(user_id), 'sessions')
+
+    @staticmethod
+    def get_revoked_access_token_key(user_id: str, access_token: str) -> str:
+        digest = hashlib.sha256(access_token.encode()).hexdigest()
+        return make_key(user_tag(user_id), 'revoked', digest)
+
+    @staticmethod
+    def get_session_value(token: str) -> str:
+        expires: int = settings.REFRESH_TOKEN_EXPIRES_IN * 24 * 60 * 60
+        return f'{int(datetime.utcnow().timestamp()) + expires}:{token}'
+
     @staticmethod
     async def save_refresh_token_to_cache(
-        user_id: str, token: str, cache: client.Redis
+        user_id: str, session_id: str, token: str, cache: client.Redis
     ) -> None:
-        expires: int = settings.REFRESH_TOKEN_EXPIRES_IN  * 24 * 60 * 60
-        await cache.setex(user_id, expires, token)
+        expires: int = settings.REFRESH_TOKEN_EXPIRES_IN * 24 * 60 * 60
+        await cache.eval(
+            SAVE_SESSION_SCRIPT,
+            1,
+            TokenService.get_sessions_key(user_id),
+            session_id,
+            TokenService.get_session_value(token),
+            int(datetime.utcnow().timestamp()),
+            expires
+        )
 
     @staticmethod
-    async def delete_refresh_token_from_cache(
-        cache: client.Redis, user_id: str
+    async def revoke_session(
+        access_token: str, refresh_token: str, cache: client.Redis
     ) -> None:
-        await cache.delete(user_id)
+        user_id = await TokenService.get_user_id_by_token(access_token)
+        session_id = await TokenService.get_session_id_by_token(refresh_token)
+        expires: int = settings.ACCESS_TOKEN_EXPIRES_IN * 24 * 60 * 60
+        async with cache.pipeline(transaction=True) as pipe:
+            pipe.setex(TokenService.get_revoked_access_token_key(user_id, access_token), expires, 1)
+            pipe.hdel(TokenService.get_sessions_key(user_id), session_id)
+            await pipe.execute()
 
     @staticmethod
     async def refresh_tokens(
-        user_id: str, old_access_token: str, old_refresh_token: str, cache: client.Redis
+        user_id: str,
+        old_access_token: str,
+        old_refresh_token: str,
+        cache: client.Redis,
+        detect_reuse: bool = True
     ) -> tuple[str, str]:
-        if await TokenService.check_old_token_equal_stored_token(
-            user_id, old_refresh_token, cache
-        ):
-            new_access_token, new_refresh_token = await TokenService.generate_tokens(
-                user_id
+        session_id = await TokenService.get_session_id_by_refresh_token(
+            user_id, old_refresh_token
+        )
+        new_access_token, new_refresh_token = await TokenService.generate_tokens(
+            user_id, session_id
+        )
+        rotated = await cache.eval(
+            ROTATE_SESSION_SCRIPT,
+            2,
+            TokenService.get_sessions_key(user_id),
+            TokenService.get_revoked_access_token_key(user_id, old_access_token),
+            session_id,
+            old_refresh_token,
+            TokenService.get_session_value(new_refresh_token),
+            int(datetime.utcnow().timestamp()),
+            settings.REFRESH_TOKEN_EXPIRES_IN * 24 * 60 * 60,
+            settings.ACCESS_TOKEN_EXPIRES_IN * 24 * 60 * 60,
+            int(detect_reuse)
+        )
+        if rotated == -1:
+            raise HTTPException(
+                status_code=400,
+                detail='Refresh-токен уже был использован, сессия отозвана. '
+                       'Требуется пройти аутентификацию.'
             )
-            await TokenService.save_refresh_token_to_cache(
-                user_id, new_refresh_token, cache
+        if rotated == 2:
+            raise HTTPException(
+                status_code=400,
+                detail='Токены уже обновлены параллельным запросом. '
+                       'Повторите запрос с новыми токенами.'
             )
-            await TokenService.add_invalid_access_token_to_cache(
-                old_access_token, cache
+        if rotated != 1:
+            raise HTTPException(
+                status_code=400,
+                detail='Недействительный refresh-токен. Требуется пройти аутентификацию.'
             )
-            return new_access_token, new_refresh_token
+        return new_access_token, new_refresh_token
 
     @staticmethod
-    async def check_old_token_equal_stored_token(
-        user_id: str, old_token: str, cache: client.Redis
-    ) -> bool:
-        stored_token: bytes = await cache.get(user_id)
-        if not stored_token or stored_token.decode() != old_token:
+    async def get_session_id_by_refresh_token(user_id: str, refresh_token: str) -> str:
+        try:
+            claims = jwt.decode(
+                refresh_token,
+                settings.REFRESH_JWT_SECRET_KEY,
+                algorithms=[settings.JWT_REFRESH_ALGORITHM]
+            )
+        except PyJWTError:
+            claims = {}
+        if claims.get('sub') != user_id or 'sid' not in claims:
             raise HTTPException(
                 status_code=400,
                 detail='Недействительный refresh-токен. Требуется пройти аутентификацию.'
             )
-        return True
-
-    @staticmethod
-    async def add_invalid_access_token_to_cache(
-        access_token: str, cache: client.Redis
-    ) -> None:
-        current_datetime = datetime.now()
-        invalid_token_key = f'invalid:{current_datetime}'
-        expires: int = settings.ACCESS_TOKEN_EXPIRES_IN * 24 * 60 * 60
-        await cache.setex(invalid_token_key, expires, access_token)
+        return claims['sid']
 
     @staticmethod
     async def check_access_token_valid_or_return_new_tokens(
         access_token: str
     ) -> bool | tuple[str]:
-        cache = await client.Redis()
+        cache = await get_redis()
         if await TokenService.check_access_token_not_used_for_logout(
             access_token, cache
         ):
@@ -117,61 +223,99 @@ class TokenService:
                 return True
             else:
                 user_id = await TokenService.get_user_id_by_token(access_token)
-                refresh_token = await TokenService.get_refresh_token_from_cache(user_id, cache)
+                session_id = await TokenService.get_session_id_by_token(access_token)
+                refresh_token = await TokenService.get_refresh_token_from_cache(
+                    user_id, session_id, cache
+                )
+                # Refresh-токен прочитан сервером, а не предъявлен клиентом:
+                # расхождение значит, что его уже обновил параллельный запрос
+                # с тем же access-токеном, и отзывать сессию нельзя.
                 new_access_token, new_refresh_token = (
-                    await TokenService.refresh_tokens(user_id, access_token, refresh_token)
+                    await TokenService.refresh_tokens(
+                        user_id, access_token, refresh_token, cache, detect_reuse=False
+                    )
                 )
                 return new_access_token, new_refresh_token
     
     @staticmethod
-    async def get_refresh_token_from_cache(user_id: str, cache: client.Redis) -> str:
-        token: bytes = await cache.get(user_id)
-        if token:
-            return token.decode()
+    async def get_refresh_token_from_cache(
+        user_id: str, session_id: str | None, cache: client.Redis
+    ) -> str:
+        if session_id:
+            session: bytes = await cache.hget(
+                TokenService.get_sessions_key(user_id), session_id
+            )
+            if session:
+                return session.decode().partition(':')[2]
         raise HTTPException(status_code=400, detail='Требуется пройти аутентификацию.')
 
     @staticmethod
     async def check_access_token_signature_valid(access_token: str) -> bool:
         try:
-            decoded_token = jwt.decode(
-                access_token,
-                settings.ACCESS_JWT_SECRET_KEY,
-                settings.JWT_ALGORITHM)
+            decoded_token = decode_access_token(access_token)
             if decoded_token:
                 return True
         except ExpiredSignatureError:
             return False
-        except JWTError:
+        except PyJWTError:
             raise HTTPException(
                 status_code=400,
                 detail='Недействительный access-токен. Требуется пройти аутентификацию.'
             )
         
 
+    @staticmethod
+    async def get_user_id_if_authorized(
+        authorization: str | None, cache: client.Redis
+    ) -> str | None:
+        """
+        Для публичных чтений: неверный заголовок, токен с ошибкой подписи
+        или отозванный при выходе токен дают анонимный ответ, а не ошибку.
+        Если отзыв нельзя проверить из-за недоступности Redis, токену тоже
+        не доверяем.
+        """
+        if not authorization:
+            return None
+        try:
+            access_token = await TokenService.get_token_authorization(authorization)
+            claims = decode_access_token(access_token)
+            await TokenService.check_access_token_not_used_for_logout(access_token, cache)
+        except (HTTPException, PyJWTError, *UNAVAILABLE_ERRORS):
+            return None
+        return claims.get('sub')
+
     @staticmethod
     async def get_user_id_by_token(access_token: str) -> str:
-        claims = jwt.get_unverified_claims(access_token)
+        claims = jwt.decode(access_token, options={'verify_signature': False})
         return claims['sub']
+
+    @staticmethod
+    async def get_session_id_by_token(token: str) -> str | None:
+        claims = jwt.decode(token, options={'verify_signature': False})
+        return claims.get('sid')
     
     @staticmethod
     async def check_access_token_not_used_for_logout(
         access_token: str, cache: client.Redis
     ) -> bool:
-        cursor, keys = await cache.scan(b'0', match='invalid*')
-        for key in keys:
-            value = await cache.get(key)
-            if value == access_token.encode():
-                raise HTTPException(
-                    status_code=400,
-                    detail='Недействительный access-token. \
-                        Требуется пройти аутентификацию.'
-                )
+        try:
+            user_id = await TokenService.get_user_id_by_token(access_token)
+        except (PyJWTError, KeyError):
+            # Нечитаемый токен отклоняется при проверке подписи.
+            return True
+        revoked_key = TokenService.get_revoked_access_token_key(user_id, access_token)
+        if await redis_breaker.call(lambda: cache.exists(revoked_key)):
+            raise HTTPException(
+                status_code=400,
+                detail='Недействительный access-token. \
+                    Требуется пройти аутентификацию.'
+            )
         return True
     
     @staticmethod
     async def get_token_authorization(authorization: Annotated[str, Header()]) -> str:
-        scheme, token = authorization.split(' ')
-        if scheme.lower() != 'bearer':
+        scheme, _, token = authorization.strip().partition(' ')
+        if scheme.lower() != 'bearer' or not token or ' ' in token:
             raise HTTPException(
                 status_code=401, detail='Недействительная схема авторизации.'
                 )
@@ -1,8 +1,9 @@
+import uuid
+
 from fastapi import HTTPException
 from redis import client
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from werkzeug.security import generate_password_hash, check_password_hash
 
 from src.schemas import Token, UserLogin, UserRegistration
 from src.models import User
@@ -44,6 +45,10 @@ class UserService:
     async def save_user_to_database(
         user: UserRegistration, db_session: AsyncSession
     ) -> str:
+        # werkzeug нужен только при регистрации и входе, поэтому
+        # импортируется при первом вызове, а не при старте сервиса.
+        from werkzeug.security import generate_password_hash
+
         hashed_password = generate_password_hash(user.password)
         new_user = User(
             login=user.login,
@@ -57,11 +62,18 @@ class UserService:
         return "Вы успешно зарегистрировались."
     
     @staticmethod
-    async def login_user(user: UserLogin, db_session: AsyncSession, cache: client.Redis) -> tuple:
+    async def login_user(
+        user: UserLogin, device_id: str | None, db_session: AsyncSession, cache: client.Redis
+    ) -> tuple:
         if await UserService.check_credentials_correct(user.login, user.password, db_session):
             user_id = await UserService.get_user_id_by_login(user, db_session)
-            access_token, refresh_token = await TokenService.generate_tokens(user_id)
-            await TokenService.save_refresh_token_to_cache(user_id, refresh_token, cache)
+            session_id = device_id or uuid.uuid4().hex
+            access_token, refresh_token = await TokenService.generate_tokens(
+                user_id, session_id
+            )
+            await TokenService.save_refresh_token_to_cache(
+                user_id, session_id, refresh_token, cache
+            )
             success = "Вы успешно вошли в свою учётную запись."
             headers = {
                 'X-Access-Token': access_token,
@@ -71,6 +83,8 @@ class UserService:
     
     @staticmethod
     async def check_credentials_correct(login: str, password: str, db_session: AsyncSession) -> bool:
+        from werkzeug.security import check_password_hash
+
         query_for_login = select(User.login).filter(User.login == login)
         result = await db_session.execute(query_for_login)
         if result.scalar_one_or_none():
@@ -92,7 +106,5 @@ class UserService:
         
     @staticmethod
     async def logout_user(tokens: Token, cache: client.Redis) -> str:
-        await TokenService.add_invalid_access_token_to_cache(tokens.access_token, cache)
-        user_id = await TokenService.get_user_id_by_token(tokens.access_token)
-        await TokenService.delete_refresh_token_from_cache(cache, user_id)
+        await TokenService.revoke_session(tokens.access_token, tokens.refresh_token, cache)
         return 'Вы успешно вышли из учётной записи.'
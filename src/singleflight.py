@@ -0,0 +1,33 @@
+import asyncio
+from collections import Counter
+from typing import Awaitable, Callable, TypeVar
+
+
+T = TypeVar('T')
+
+
+class SingleFlight:
+    """
+    Объединение одновременных вызовов с одним ключом: первый вызов запускает
+    загрузку отдельной задачей, остальные ждут её результата (или исключения).
+    Задача не отменяется, если клиент первого запроса отключился, —
+    её результат всё ещё нужен остальным.
+    """
+
+    def __init__(self) -> None:
+        self.calls: dict[str, asyncio.Task] = {}
+        self.metrics: Counter = Counter()
+
+    async def run(self, key: str, load: Callable[[], Awaitable[T]]) -> T:
+        task = self.calls.get(key)
+        if task is None:
+            task = asyncio.create_task(load())
+            self.calls[key] = task
+            task.add_done_callback(lambda _: self.calls.pop(key, None))
+            self.metrics['loaded'] += 1
+        else:
+            self.metrics['shared'] += 1
+        return await asyncio.shield(task)
+
+    def get_metrics(self) -> dict:
+        return {'in_flight': len(self.calls), **self.metrics}
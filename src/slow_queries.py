@@ -0,0 +1,129 @@
+import asyncio
+import hashlib
+import logging
+import random
+import re
+from collections import OrderedDict
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+
+logger = logging.getLogger(__name__)
+
+EXPLAINABLE = re.compile(r'^\s*(SELECT|WITH)\b', re.IGNORECASE)
+# Диалект asyncpg дописывает к параметрам приведение типа: '$2::UUID',
+# '$1::TIMESTAMP WITHOUT TIME ZONE'. Оно входит в параметр, чтобы список
+# IN любой длины сворачивался в один '?'.
+PLACEHOLDER = r'(?:\$\d+|%\(\w+\)s)(?:::\w+(?: WITH(?:OUT)? TIME ZONE)?(?:\[\])?)?'
+PLACEHOLDERS = re.compile(rf'{PLACEHOLDER}(?:\s*,\s*{PLACEHOLDER})*')
+ROW_LISTS = re.compile(r'\(\?\)(?:\s*,\s*\(\?\))+')
+LITERALS = re.compile(r"'(?:[^']|'')*'")
+MAX_STATEMENT_LENGTH = 2000
+
+
+class SlowQueryLog:
+    """
+    Журнал медленных запросов, сгруппированных по отпечатку — тексту запроса
+    с нормализованными пробелами и свёрнутыми списками параметров. Значения
+    параметров не сохраняются и не пишутся в лог.
+
+    Для доли sample_rate медленных SELECT в фоне на отдельном соединении
+    выполняется EXPLAIN (ANALYZE, BUFFERS) в транзакции только для чтения;
+    одновременно — не больше одного плана на отпечаток, литералы в плане
+    заменяются на '?'. Журнал ведётся в каждом воркере отдельно.
+    """
+
+    def __init__(self, dsn: str, sample_rate: float, max_statements: int) -> None:
+        self.dsn = dsn
+        self.sample_rate = sample_rate
+        self.max_statements = max_statements
+        self.statements: OrderedDict[str, dict] = OrderedDict()
+        self.explaining: set[str] = set()
+        self.tasks: set[asyncio.Task] = set()
+        self.engine: AsyncEngine | None = None
+
+    @staticmethod
+    def get_fingerprint(statement: str) -> tuple[str, str]:
+        normalized = PLACEHOLDERS.sub('?', ' '.join(statement.split()))
+        # Списки строк '(($1, $2), ($3, $4))' после первой замены — '((?), (?))'.
+        normalized = ROW_LISTS.sub('(?)', normalized)
+        return hashlib.sha1(normalized.encode()).hexdigest()[:16], normalized
+
+    def record(
+        self, statement: str, parameters, duration: float, executemany: bool
+    ) -> None:
+        fingerprint, normalized = self.get_fingerprint(statement)
+        entry = self.statements.get(fingerprint)
+        if entry is None:
+            entry = self.statements[fingerprint] = {
+                'fingerprint': fingerprint,
+                'statement': normalized[:MAX_STATEMENT_LENGTH],
+                'calls': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'last_seen': None,
+                'explain': None,
+                'explained_at': None
+            }
+            while len(self.statements) > self.max_statements:
+                self.statements.popitem(last=False)
+        self.statements.move_to_end(fingerprint)
+        duration_ms = duration * 1000
+        entry['calls'] += 1
+        entry['total_ms'] += duration_ms
+        entry['max_ms'] = max(entry['max_ms'], duration_ms)
+        entry['last_seen'] = datetime.now()
+        logger.warning(
+            'Slow query %s took %.0f ms (%d parameters redacted): %s',
+            fingerprint, duration_ms, len(parameters or ()), entry['statement']
+        )
+        if (executemany or fingerprint in self.explaining
+                or not EXPLAINABLE.match(statement)
+                or random.random() >= self.sample_rate):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self.explaining.add(fingerprint)
+        task = loop.create_task(self.explain(fingerprint, statement, tuple(parameters or ())))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def explain(self, fingerprint: str, statement: str, parameters: tuple) -> None:
+        try:
+            if self.engine is None:
+                self.engine = create_async_engine(self.dsn, poolclass=NullPool)
+            async with self.engine.connect() as connection:
+                await connection.exec_driver_sql('SET TRANSACTION READ ONLY')
+                result = await connection.exec_driver_sql(
+                    f'EXPLAIN (ANALYZE, BUFFERS) {statement}', parameters
+                )
+                plan = '\n'.join(row[0] for row in result)
+                await connection.rollback()
+            entry = self.statements.get(fingerprint)
+            if entry is not None:
+                entry['explain'] = LITERALS.sub("'?'", plan)
+                entry['explained_at'] = datetime.now()
+        except Exception:
+            logger.exception('EXPLAIN of slow query %s failed', fingerprint)
+        finally:
+            self.explaining.discard(fingerprint)
+
+    def get_report(self) -> list[dict]:
+        return sorted(
+            ({**entry, 'avg_ms': entry['total_ms'] / entry['calls']}
+             for entry in self.statements.values()),
+            key=lambda entry: entry['total_ms'],
+            reverse=True
+        )
+
+    async def close(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        if self.engine is not None:
+            await self.engine.dispose()
+            self.engine = None
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from collections import Counter, defaultdict
+
+from redis.asyncio import client
+
+from config import settings
+from src.services.view_service import ViewService
+
+
+logger = logging.getLogger(__name__)
+
+
+class ViewRecorder:
+    """
+    Буфер просмотров постов в памяти процесса. Запрос только отмечает просмотр
+    в буфере, а фоновая задача раз в VIEW_FLUSH_INTERVAL миллисекунд (или раньше,
+    если в буфере больше VIEW_BUFFER_MAXSIZE постов) сбрасывает его в Redis
+    одним конвейером INCRBY/PFADD. При ошибке Redis накопленные просмотры
+    теряются: статистика не стоит того, чтобы задерживать чтение постов.
+    """
+
+    def __init__(self, cache: client.Redis, flush_interval: float, maxsize: int) -> None:
+        self.cache = cache
+        self.flush_interval = flush_interval
+        self.maxsize = maxsize
+        self.counts: Counter = Counter()
+        self.viewers: dict[str, set[str]] = defaultdict(set)
+        self.flush_requested = asyncio.Event()
+        self.task: asyncio.Task | None = None
+        self.metrics: Counter = Counter()
+
+    async def start(self) -> None:
+        self.task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+        await self.flush()
+
+    def record(self, post_id: str, viewer_id: str) -> None:
+        self.counts[post_id] += 1
+        self.viewers[post_id].add(viewer_id)
+        self.metrics['recorded'] += 1
+        if len(self.counts) >= self.maxsize:
+            self.flush_requested.set()
+
+    async def flush(self) -> None:
+        if not self.counts:
+            return
+        counts, self.counts = self.counts, Counter()
+        viewers, self.viewers = self.viewers, defaultdict(set)
+        try:
+            await ViewService.save_views(
+                {post_id: (count, viewers[post_id]) for post_id, count in counts.items()},
+                self.cache
+            )
+            self.metrics['flushed'] += sum(counts.values())
+        except Exception:
+            self.metrics['lost'] += sum(counts.values())
+            logger.exception('Failed to flush %d post views', sum(counts.values()))
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self.flush_requested.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.flush_requested.clear()
+            await self.flush()
+
+    def get_metrics(self) -> dict:
+        return {'pending': sum(self.counts.values()), **self.metrics}
+
+
+view_recorder: ViewRecorder | None = None
+
+
+async def start_view_recorder(cache: client.Redis) -> None:
+    global view_recorder
+    view_recorder = ViewRecorder(
+        cache,
+        flush_interval=settings.VIEW_FLUSH_INTERVAL / 1000,
+        maxsize=settings.VIEW_BUFFER_MAXSIZE
+    )
+    await view_recorder.start()
+
+
+async def stop_view_recorder() -> None:
+    if view_recorder is not None:
+        await view_recorder.stop()
+
+
+async def get_view_recorder() -> ViewRecorder:
+    return view_recorder
@@ -0,0 +1,28 @@
+import os
+
+# Обязательные настройки для импорта config; Postgres и Redis в тестах
+# не используются: Redis заменяется fakeredis, загрузка из базы — заглушкой.
+for name, value in {
+    'DB_USER': 'test',
+    'DB_PASSWORD': 'test',
+    'ACCESS_JWT_SECRET_KEY': 'test-access-secret-key-of-32-bytes',
+    'REFRESH_JWT_SECRET_KEY': 'test-refresh-secret-key-of-32-bytes',
+    'ACCESS_TOKEN_EXPIRES_IN': '1',
+    'REFRESH_TOKEN_EXPIRES_IN': '10',
+}.items():
+    os.environ.setdefault(name, value)
+
+import pytest  # noqa: E402
+from fakeredis import FakeAsyncRedis  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return 'asyncio'
+
+
+@pytest.fixture
+async def cache():
+    cache = FakeAsyncRedis()
+    yield cache
+    await cache.aclose()
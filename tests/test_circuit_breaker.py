@@ -0,0 +1,166 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from redis.exceptions import ConnectionError, ResponseError, TimeoutError
+
+from src.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    # Подменяется модуль time только для размыкателя: часы цикла asyncio
+    # должны идти как обычно.
+    monkeypatch.setattr('src.circuit_breaker.time', SimpleNamespace(monotonic=clock))
+    return clock
+
+
+@pytest.fixture
+def breaker(clock) -> CircuitBreaker:
+    return CircuitBreaker(timeout=0.05, failure_threshold=2, reset_timeout=5)
+
+
+async def succeed() -> str:
+    return 'ok'
+
+
+async def fail() -> None:
+    raise ConnectionError('connection refused')
+
+
+async def hang() -> None:
+    await asyncio.sleep(1)
+
+
+async def open_circuit(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(ConnectionError):
+            await breaker.call(fail)
+
+
+async def test_success_keeps_circuit_closed(breaker) -> None:
+    assert await breaker.call(succeed) == 'ok'
+    assert breaker.state == CLOSED
+
+
+async def test_opens_after_consecutive_failures(breaker) -> None:
+    with pytest.raises(ConnectionError):
+        await breaker.call(fail)
+    assert breaker.state == CLOSED
+
+    with pytest.raises(ConnectionError):
+        await breaker.call(fail)
+    assert breaker.state == OPEN
+    assert breaker.metrics['opened'] == 1
+
+
+async def test_success_resets_failure_count(breaker) -> None:
+    with pytest.raises(ConnectionError):
+        await breaker.call(fail)
+    await breaker.call(succeed)
+    with pytest.raises(ConnectionError):
+        await breaker.call(fail)
+
+    assert breaker.state == CLOSED
+
+
+async def test_open_circuit_rejects_without_calling_redis(breaker) -> None:
+    await open_circuit(breaker)
+    calls = 0
+
+    async def operation() -> str:
+        nonlocal calls
+        calls += 1
+        return 'ok'
+
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(operation)
+    assert calls == 0
+    assert breaker.metrics['rejected'] == 1
+
+
+async def test_timeout_counts_as_failure(breaker) -> None:
+    with pytest.raises(TimeoutError):
+        await breaker.call(hang)
+
+    assert breaker.failures == 1
+    assert breaker.metrics['timeouts'] == 1
+
+
+async def test_command_error_is_not_a_failure(breaker) -> None:
+    async def wrong_type() -> None:
+        raise ResponseError('WRONGTYPE')
+
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(ResponseError):
+            await breaker.call(wrong_type)
+
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+
+
+async def test_half_open_trial_success_closes_circuit(breaker, clock) -> None:
+    await open_circuit(breaker)
+    clock.now += breaker.reset_timeout
+
+    assert await breaker.call(succeed) == 'ok'
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+
+
+async def test_half_open_trial_failure_reopens_circuit(breaker, clock) -> None:
+    await open_circuit(breaker)
+    clock.now += breaker.reset_timeout
+
+    with pytest.raises(ConnectionError):
+        await breaker.call(fail)
+    assert breaker.state == OPEN
+    assert breaker.opened_at == clock.now
+
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(succeed)
+
+
+async def test_half_open_lets_single_trial_through(breaker, clock) -> None:
+    await open_circuit(breaker)
+    clock.now += breaker.reset_timeout
+    release = asyncio.Event()
+
+    async def trial() -> str:
+        await release.wait()
+        return 'ok'
+
+    first = asyncio.create_task(breaker.call(trial))
+    await asyncio.sleep(0)
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(succeed)
+    release.set()
+
+    assert await first == 'ok'
+    assert breaker.state == CLOSED
+
+
+async def test_metrics_report_fallback_rate(breaker) -> None:
+    await breaker.call(succeed)
+    with pytest.raises(ConnectionError):
+        await breaker.call(fail)
+    breaker.record_fallback('reaction_counts')
+
+    metrics = breaker.get_metrics()
+    assert metrics['state'] == CLOSED
+    assert metrics['fallback_rate'] == 0.5
+    assert metrics['fallback_reaction_counts'] == 1
@@ -0,0 +1,30 @@
+import pytest
+
+import databases
+from config import settings
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients(monkeypatch) -> None:
+    monkeypatch.setattr(databases, 'redis', None)
+    monkeypatch.setattr(databases, 'blocking_redis', None)
+
+
+async def test_shared_client_bounds_every_command() -> None:
+    cache = await databases.get_redis()
+
+    assert cache.connection_pool.connection_kwargs['socket_timeout'] == (
+        settings.REDIS_COMMAND_TIMEOUT / 1000
+    )
+    assert await databases.get_redis() is cache
+
+
+async def test_blocking_client_is_separate_and_unbounded() -> None:
+    cache = await databases.get_redis()
+    blocking_cache = await databases.get_blocking_redis()
+
+    assert blocking_cache is not cache
+    assert blocking_cache.connection_pool.connection_kwargs['socket_timeout'] is None
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
+
+from src.jwt_keys import JWTKeySet
+
+
+class Clock:
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def write_key(directory, kid: str) -> None:
+    pem = ed25519.Ed25519PrivateKey.generate().private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    )
+    (directory / f'{kid}.pem').write_bytes(pem)
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr('src.jwt_keys.time', SimpleNamespace(monotonic=clock))
+    return clock
+
+
+@pytest.fixture
+def key_set(tmp_path, clock) -> JWTKeySet:
+    write_key(tmp_path, 'first')
+    key_set = JWTKeySet(str(tmp_path), None, reload_interval=60, forced_reload_interval=5)
+    key_set.loads = 0
+    load = key_set.load
+
+    def counting_load() -> None:
+        key_set.loads += 1
+        load()
+
+    key_set.load = counting_load
+    return key_set
+
+
+def test_known_kid_does_not_reload(key_set) -> None:
+    assert key_set.get_verification_key('first').kid == 'first'
+    assert key_set.get_verification_key('first').kid == 'first'
+    assert key_set.loads == 1
+
+
+def test_unknown_kids_reload_at_most_once_per_interval(key_set, clock) -> None:
+    key_set.get_verification_key('first')
+
+    for number in range(100):
+        assert key_set.get_verification_key(f'random-{number}') is None
+    assert key_set.loads == 2
+
+    clock.now += 5
+    assert key_set.get_verification_key('random') is None
+    assert key_set.loads == 3
+
+
+def test_missing_kid_does_not_reload(key_set) -> None:
+    key_set.get_verification_key('first')
+
+    assert key_set.get_verification_key(None) is None
+    assert key_set.loads == 1
+
+
+def test_new_key_is_found_by_forced_reload(key_set, tmp_path) -> None:
+    key_set.get_verification_key('first')
+    write_key(tmp_path, 'second')
+
+    assert key_set.get_verification_key('second').kid == 'second'
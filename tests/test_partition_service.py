@@ -0,0 +1,33 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql
+
+from src.services.partition_service import PostPartitionService
+
+
+def compile_filter(post_id: str) -> str:
+    return str(PostPartitionService.filter_by_id(post_id).compile(dialect=postgresql.dialect()))
+
+
+def test_time_ordered_id_round_trips_creation_dt() -> None:
+    creation_dt = datetime(2026, 10, 19, 13, 0, 4, 552000)
+    post_id = PostPartitionService.make_post_id(creation_dt)
+
+    assert post_id.version == 7
+    assert PostPartitionService.get_creation_dt(post_id) == creation_dt
+
+
+def test_time_ordered_id_filters_by_partition_key() -> None:
+    post_id = str(PostPartitionService.make_post_id(datetime(2026, 10, 19)))
+
+    assert 'creation_dt' in compile_filter(post_id)
+
+
+def test_random_id_filters_by_id_only() -> None:
+    assert 'creation_dt' not in compile_filter(str(uuid.uuid4()))
+
+
+def test_invalid_ids_match_nothing() -> None:
+    assert compile_filter('not-a-uuid') == 'false'
+    assert compile_filter('ffffffff-ffff-7fff-bfff-ffffffffffff') == 'false'
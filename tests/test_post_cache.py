@@ -0,0 +1,128 @@
+import asyncio
+import time
+
+import pytest
+
+from config import settings
+from src.compression import IDENTITY
+from src.services.cache_service import META_FIELD, PostCacheService
+from src.services.post_service import PostService
+
+
+POST_ID = '0192a1b2-c3d4-7e5f-8a9b-0c1d2e3f4a5b'
+
+
+@pytest.fixture
+def random_value(monkeypatch):
+    def set_random(value: float) -> None:
+        monkeypatch.setattr('src.services.cache_service.random.random', lambda: value)
+    return set_random
+
+
+class TestShouldRefreshEarly:
+
+    def test_without_meta(self) -> None:
+        assert PostCacheService.should_refresh_early(None) is False
+        assert PostCacheService.should_refresh_early(b'') is False
+
+    def test_fresh_entry_is_not_refreshed(self, random_value) -> None:
+        random_value(0.5)
+        meta = f'0.01:{time.time() + 60}'.encode()
+        assert PostCacheService.should_refresh_early(meta) is False
+
+    def test_expired_entry_is_refreshed(self, random_value) -> None:
+        random_value(0.0)
+        meta = f'0.01:{time.time() - 1}'.encode()
+        assert PostCacheService.should_refresh_early(meta) is True
+
+    def test_slow_build_is_refreshed_earlier(self, random_value) -> None:
+        # -ln(1 - 0.99) ≈ 4.6: запись, которая строится секунду,
+        # обновляется примерно за 4.6 с до истечения, а быстрая — нет.
+        random_value(0.99)
+        expires_at = time.time() + 3
+        assert PostCacheService.should_refresh_early(f'1.0:{expires_at}'.encode()) is True
+        assert PostCacheService.should_refresh_early(f'0.01:{expires_at}'.encode()) is False
+
+    def test_beta_scales_refresh_window(self, random_value, monkeypatch) -> None:
+        random_value(0.99)
+        meta = f'1.0:{time.time() + 3}'.encode()
+        monkeypatch.setattr(settings, 'POST_CACHE_EARLY_REFRESH_BETA', 0.5)
+        assert PostCacheService.should_refresh_early(meta) is False
+
+
+@pytest.mark.anyio
+class TestRebuildPostPayloads:
+
+    @pytest.fixture(autouse=True)
+    def lock_settings(self, monkeypatch) -> None:
+        monkeypatch.setattr(settings, 'POST_CACHE_LOCK_ENABLED', True)
+        monkeypatch.setattr(settings, 'POST_CACHE_LOCK_TIMEOUT', 1000)
+        monkeypatch.setattr(settings, 'POST_CACHE_LOCK_POLL_INTERVAL', 10)
+
+    @pytest.fixture
+    def builds(self, monkeypatch) -> list[str]:
+        builds = []
+
+        async def build_post_payloads(post_id, cache) -> dict[str, bytes]:
+            builds.append(post_id)
+            return {IDENTITY: b'{"title":"built"}'}
+
+        monkeypatch.setattr(PostService, 'build_post_payloads', build_post_payloads)
+        return builds
+
+    @staticmethod
+    async def hold_lock(cache) -> None:
+        await cache.set(PostCacheService.get_rebuild_lock_key(POST_ID), 'other-worker')
+
+    async def test_builds_under_lock_and_releases_it(self, cache, builds) -> None:
+        payloads = await PostService.rebuild_post_payloads(POST_ID, cache, wait=True)
+
+        assert payloads == {IDENTITY: b'{"title":"built"}'}
+        assert builds == [POST_ID]
+        assert not await cache.exists(PostCacheService.get_rebuild_lock_key(POST_ID))
+
+    async def test_early_refresh_does_not_wait_for_other_worker(self, cache, builds) -> None:
+        await self.hold_lock(cache)
+
+        assert await PostService.rebuild_post_payloads(POST_ID, cache, wait=False) is None
+        assert builds == []
+
+    async def test_waits_for_entry_built_by_lock_holder(self, cache, builds) -> None:
+        await self.hold_lock(cache)
+
+        async def other_worker() -> None:
+            await asyncio.sleep(0.05)
+            await cache.hset(
+                PostCacheService.get_post_cache_key(POST_ID),
+                mapping={IDENTITY: b'{"title":"cached"}', META_FIELD: b'0.01:0'}
+            )
+
+        payloads, _ = await asyncio.gather(
+            PostService.rebuild_post_payloads(POST_ID, cache, wait=True), other_worker()
+        )
+
+        assert payloads == {IDENTITY: b'{"title":"cached"}'}
+        assert builds == []
+
+    async def test_builds_when_lock_holder_gives_up(self, cache, builds) -> None:
+        await self.hold_lock(cache)
+
+        async def other_worker() -> None:
+            await asyncio.sleep(0.05)
+            await cache.delete(PostCacheService.get_rebuild_lock_key(POST_ID))
+
+        payloads, _ = await asyncio.gather(
+            PostService.rebuild_post_payloads(POST_ID, cache, wait=True), other_worker()
+        )
+
+        assert payloads == {IDENTITY: b'{"title":"built"}'}
+        assert builds == [POST_ID]
+
+    async def test_builds_after_lock_timeout(self, cache, builds, monkeypatch) -> None:
+        monkeypatch.setattr(settings, 'POST_CACHE_LOCK_TIMEOUT', 50)
+        await self.hold_lock(cache)
+
+        payloads = await PostService.rebuild_post_payloads(POST_ID, cache, wait=True)
+
+        assert payloads == {IDENTITY: b'{"title":"built"}'}
+        assert builds == [POST_ID]
@@ -0,0 +1,163 @@
+import asyncio
+import uuid
+from collections import OrderedDict
+
+import pytest
+from fakeredis import FakeAsyncRedis, FakeServer
+
+from config import settings
+from src.circuit_breaker import OPEN, CircuitBreaker
+from src.compression import IDENTITY
+from src.models import Post
+from src.services import post_service
+from src.services.cache_service import PostCacheService, PostCountsCacheService
+from src.services.post_service import PostService
+from src.services.reaction_service import LIKE, ReactionService
+from src.services.view_service import ViewService
+
+
+pytestmark = pytest.mark.anyio
+
+POST_ID = '0192a1b2-c3d4-7e5f-8a9b-0c1d2e3f4a5b'
+USER_ID = '0192a1b2-c3d4-7e5f-8a9b-0c1d2e3f4a5c'
+
+
+@pytest.fixture(autouse=True)
+def breaker(monkeypatch) -> CircuitBreaker:
+    breaker = CircuitBreaker(timeout=0.5, failure_threshold=2, reset_timeout=60)
+    monkeypatch.setattr(post_service, 'redis_breaker', breaker)
+    return breaker
+
+
+@pytest.fixture(autouse=True)
+def local_counts(monkeypatch) -> None:
+    monkeypatch.setattr(PostCountsCacheService, 'reaction_counts', OrderedDict())
+    monkeypatch.setattr(PostCountsCacheService, 'view_counts', OrderedDict())
+
+
+@pytest.fixture
+def server() -> FakeServer:
+    return FakeServer()
+
+
+@pytest.fixture
+async def cache(server):
+    cache = FakeAsyncRedis(server=server)
+    yield cache
+    await cache.aclose()
+
+
+@pytest.fixture
+def post() -> Post:
+    post = Post(title='title', content='content', author_id=uuid.UUID(USER_ID))
+    post.id, post.likes_count, post.dislikes_count = uuid.UUID(POST_ID), 7, 2
+    return post
+
+
+class TestReactionCounts:
+
+    async def test_remembers_counts_read_from_redis(self, cache, post) -> None:
+        await ReactionService.add_reaction(POST_ID, USER_ID, LIKE, cache)
+
+        assert await PostService.get_reaction_counts([post], cache) == ([(1, 0)], False)
+        assert PostCountsCacheService.reaction_counts[POST_ID] == (1, 0)
+
+    async def test_falls_back_to_remembered_counts(self, cache, server, post) -> None:
+        await ReactionService.add_reaction(POST_ID, USER_ID, LIKE, cache)
+        await PostService.get_reaction_counts([post], cache)
+        server.connected = False
+
+        assert await PostService.get_reaction_counts([post], cache) == ([(1, 0)], True)
+
+    async def test_falls_back_to_post_columns(self, cache, server, post, breaker) -> None:
+        server.connected = False
+
+        assert await PostService.get_reaction_counts([post], cache) == ([(7, 2)], True)
+        assert breaker.metrics['fallback_reaction_counts'] == 1
+
+    async def test_open_circuit_does_not_wait_for_redis(self, cache, server, post, breaker) -> None:
+        server.connected = False
+        for _ in range(breaker.failure_threshold):
+            await PostService.get_reaction_counts([post], cache)
+        assert breaker.state == OPEN
+
+        assert await PostService.get_reaction_counts([post], cache) == ([(7, 2)], True)
+        assert breaker.metrics['rejected'] == 1
+
+
+class TestViewCounts:
+
+    async def test_falls_back_to_remembered_counts(self, cache, server) -> None:
+        other_post_id = str(uuid.uuid4())
+        await ViewService.save_views({POST_ID: (3, {'a', 'b'})}, cache)
+        assert await PostService.get_view_counts([POST_ID], cache) == ([(3, 2)], False)
+        server.connected = False
+
+        assert await PostService.get_view_counts([POST_ID, other_post_id], cache) == (
+            [(3, 2), (0, 0)], True
+        )
+
+
+class TestUserReactions:
+
+    async def test_unknown_reaction_while_redis_is_down(self, cache, server) -> None:
+        await ReactionService.add_reaction(POST_ID, USER_ID, LIKE, cache)
+        assert await PostService.get_user_reactions(USER_ID, [POST_ID], cache) == ([LIKE], False)
+        server.connected = False
+
+        assert await PostService.get_user_reactions(USER_ID, [POST_ID], cache) == ([None], True)
+
+
+class TestRebuildPostPayloads:
+
+    @pytest.fixture(autouse=True)
+    def lock_settings(self, monkeypatch) -> None:
+        monkeypatch.setattr(settings, 'POST_CACHE_LOCK_ENABLED', True)
+        monkeypatch.setattr(settings, 'POST_CACHE_LOCK_TIMEOUT', 1000)
+        monkeypatch.setattr(settings, 'POST_CACHE_LOCK_POLL_INTERVAL', 10)
+
+    @pytest.fixture
+    def builds(self, monkeypatch) -> list[bool]:
+        builds = []
+
+        async def build_post_payloads(post_id, cache, save=True) -> dict[str, bytes]:
+            builds.append(save)
+            return {IDENTITY: b'{"title":"built"}'}
+
+        monkeypatch.setattr(PostService, 'build_post_payloads', build_post_payloads)
+        return builds
+
+    async def test_builds_without_caching_when_lock_is_unavailable(
+        self, cache, server, builds, breaker
+    ) -> None:
+        server.connected = False
+
+        payloads = await PostService.rebuild_post_payloads(POST_ID, cache, wait=True)
+
+        assert payloads == {IDENTITY: b'{"title":"built"}'}
+        assert builds == [False]
+        assert breaker.metrics['fallback_post_cache'] == 1
+
+    async def test_early_refresh_keeps_cached_entry_when_lock_is_unavailable(
+        self, cache, server, builds
+    ) -> None:
+        server.connected = False
+
+        assert await PostService.rebuild_post_payloads(POST_ID, cache, wait=False) is None
+        assert builds == []
+
+    async def test_builds_without_caching_when_redis_fails_during_wait(
+        self, cache, server, builds
+    ) -> None:
+        await cache.set(PostCacheService.get_rebuild_lock_key(POST_ID), 'other-worker')
+
+        async def redis_goes_down() -> None:
+            await asyncio.sleep(0.05)
+            server.connected = False
+
+        payloads, _ = await asyncio.gather(
+            PostService.rebuild_post_payloads(POST_ID, cache, wait=True), redis_goes_down()
+        )
+
+        assert payloads == {IDENTITY: b'{"title":"built"}'}
+        assert builds == [False]
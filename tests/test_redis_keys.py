@@ -0,0 +1,34 @@
+import uuid
+from datetime import datetime, timedelta
+
+from src.redis_keys import bucket_id
+from src.services.cache_service import PostAuthorCacheService
+from src.services.partition_service import PostPartitionService
+from src.services.reaction_service import ReactionService
+
+
+def make_post_ids(number: int) -> list[str]:
+    start = datetime(2025, 1, 1)
+    return [
+        str(PostPartitionService.make_post_id(start + timedelta(hours=3 * step)))
+        for step in range(number)
+    ]
+
+
+def test_time_ordered_ids_spread_over_buckets() -> None:
+    post_ids = make_post_ids(5840)
+
+    assert len({ReactionService.get_bucket_key(post_id) for post_id in post_ids}) > 3000
+    assert len({PostAuthorCacheService.get_bucket_key(post_id) for post_id in post_ids}) > 3000
+
+
+def test_random_ids_keep_prefix_buckets() -> None:
+    post_id = str(uuid.uuid4())
+
+    assert bucket_id(post_id, 3) == post_id[:3]
+
+
+def test_time_ordered_ids_use_random_tail() -> None:
+    [post_id] = make_post_ids(1)
+
+    assert bucket_id(post_id, 3) == post_id[-3:]
@@ -0,0 +1,14 @@
+from fastapi.testclient import TestClient
+
+from main import app
+
+
+# Клиент без контекстного менеджера не запускает startup: запросы,
+# отклонённые при разборе параметров, не обращаются к Postgres и Redis.
+client = TestClient(app)
+
+
+def test_author_stats_rejects_invalid_user_id() -> None:
+    response = client.get('/api/v1/user/not-a-uuid/stats')
+
+    assert response.status_code == 400
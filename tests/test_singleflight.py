@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from src.singleflight import SingleFlight
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_calls_share_one_load() -> None:
+    flight = SingleFlight()
+    loads = 0
+    release = asyncio.Event()
+
+    async def load() -> str:
+        nonlocal loads
+        loads += 1
+        await release.wait()
+        return 'post'
+
+    calls = [asyncio.create_task(flight.run('post-1', load)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*calls) == ['post'] * 5
+    assert loads == 1
+    assert flight.get_metrics() == {'in_flight': 0, 'loaded': 1, 'shared': 4}
+
+
+async def test_different_keys_load_separately() -> None:
+    flight = SingleFlight()
+
+    async def load(key: str) -> str:
+        await asyncio.sleep(0)
+        return key
+
+    assert await asyncio.gather(
+        flight.run('a', lambda: load('a')), flight.run('b', lambda: load('b'))
+    ) == ['a', 'b']
+    assert flight.metrics['loaded'] == 2
+
+
+async def test_exception_is_raised_to_every_caller_and_key_is_freed() -> None:
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def load() -> str:
+        await release.wait()
+        raise LookupError('not found')
+
+    calls = [asyncio.create_task(flight.run('post-1', load)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*calls, return_exceptions=True)
+
+    assert all(isinstance(result, LookupError) for result in results)
+    assert flight.calls == {}
+
+
+async def test_leader_cancellation_does_not_cancel_shared_load() -> None:
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def load() -> str:
+        await release.wait()
+        return 'post'
+
+    leader = asyncio.create_task(flight.run('post-1', load))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.run('post-1', load))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await follower == 'post'
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert flight.get_metrics() == {'in_flight': 0, 'loaded': 1, 'shared': 1}
+
+
+async def test_next_call_after_completion_loads_again() -> None:
+    flight = SingleFlight()
+    loads = 0
+
+    async def load() -> int:
+        nonlocal loads
+        loads += 1
+        return loads
+
+    assert await flight.run('post-1', load) == 1
+    await asyncio.sleep(0)
+    assert await flight.run('post-1', load) == 2
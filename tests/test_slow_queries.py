@@ -0,0 +1,52 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql.asyncpg import dialect
+
+from src.models import Post
+from src.slow_queries import SlowQueryLog
+
+
+def render(query) -> str:
+    # Так же, как при выполнении: расширяемые параметры IN разворачиваются
+    # в отдельные '$n::TYPE'.
+    return str(query.compile(dialect=dialect(), compile_kwargs={'render_postcompile': True}))
+
+
+def test_in_lists_of_any_length_share_fingerprint() -> None:
+    post_table = Post.__table__
+
+    def make_query(number: int):
+        return (select(post_table.c.id).
+                where(post_table.c.id.in_([uuid.uuid4() for _ in range(number)]),
+                      post_table.c.creation_dt < datetime.now()).
+                limit(10))
+
+    fingerprints = {SlowQueryLog.get_fingerprint(render(make_query(number))) for number in (1, 2, 3, 50)}
+
+    [(_, normalized)] = fingerprints
+    assert 'IN (?)' in normalized
+    assert '$' not in normalized and '::' not in normalized
+
+
+def test_row_lists_of_any_length_share_fingerprint() -> None:
+    post_table = Post.__table__
+
+    def make_query(number: int):
+        keys = [(uuid.uuid4(), datetime.now()) for _ in range(number)]
+        return select(post_table.c.id).where(
+            tuple_(post_table.c.id, post_table.c.creation_dt).in_(keys)
+        )
+
+    fingerprints = {SlowQueryLog.get_fingerprint(render(make_query(number))) for number in (1, 2, 5)}
+
+    assert len(fingerprints) == 1
+
+
+def test_different_statements_keep_different_fingerprints() -> None:
+    post_table = Post.__table__
+    by_id = select(post_table.c.title).where(post_table.c.id == uuid.uuid4())
+    by_author = select(post_table.c.title).where(post_table.c.author_id == uuid.uuid4())
+
+    assert SlowQueryLog.get_fingerprint(render(by_id)) != SlowQueryLog.get_fingerprint(render(by_author))
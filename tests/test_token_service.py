@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.services.token_service import TokenService
+
+
+pytestmark = pytest.mark.anyio
+
+USER_ID = '0192a1b2-c3d4-7e5f-8a9b-0c1d2e3f4a5c'
+SESSION_ID = 'session'
+
+
+@pytest.fixture
+async def tokens(cache) -> tuple[str, str]:
+    access_token, refresh_token = await TokenService.generate_tokens(USER_ID, SESSION_ID)
+    await TokenService.save_refresh_token_to_cache(USER_ID, SESSION_ID, refresh_token, cache)
+    return access_token, refresh_token
+
+
+async def get_stored_refresh_token(cache) -> str:
+    return await TokenService.get_refresh_token_from_cache(USER_ID, SESSION_ID, cache)
+
+
+async def test_rotation_replaces_stored_token(cache, tokens) -> None:
+    access_token, refresh_token = tokens
+
+    _, new_refresh_token = await TokenService.refresh_tokens(
+        USER_ID, access_token, refresh_token, cache
+    )
+
+    assert await get_stored_refresh_token(cache) == new_refresh_token
+    assert await cache.exists(TokenService.get_revoked_access_token_key(USER_ID, access_token))
+
+
+async def test_reused_client_token_revokes_session(cache, tokens) -> None:
+    access_token, refresh_token = tokens
+    await TokenService.refresh_tokens(USER_ID, access_token, refresh_token, cache)
+
+    with pytest.raises(HTTPException) as error:
+        await TokenService.refresh_tokens(USER_ID, access_token, refresh_token, cache)
+    assert 'сессия отозвана' in error.value.detail
+    assert not await cache.hexists(TokenService.get_sessions_key(USER_ID), SESSION_ID)
+
+
+async def test_concurrent_server_refresh_keeps_session(cache, tokens) -> None:
+    access_token, _ = tokens
+    # Оба запроса прочитали один и тот же сохранённый токен до ротации.
+    stored = await asyncio.gather(get_stored_refresh_token(cache), get_stored_refresh_token(cache))
+
+    results = await asyncio.gather(
+        *(
+            TokenService.refresh_tokens(USER_ID, access_token, token, cache, detect_reuse=False)
+            for token in stored
+        ),
+        return_exceptions=True
+    )
+
+    [(_, new_refresh_token)] = [result for result in results if isinstance(result, tuple)]
+    [error] = [result for result in results if isinstance(result, HTTPException)]
+    assert 'параллельным запросом' in error.detail
+    assert await get_stored_refresh_token(cache) == new_refresh_token